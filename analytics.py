@@ -0,0 +1,67 @@
+import pandas as pd
+
+# Pure transformations behind the Conversation Analytics dashboard (no Streamlit, so they can be benchmarked)
+SCORE_FIELDS = ["Rule Compliance", "Professionalism", "Clarity"]
+USAGE_FIELDS = ["Requests", "Prompt Tokens", "Completion Tokens", "Model Seconds", "Cost (USD)"]
+
+def _numeric(df, column):
+    if column not in df.columns:
+        return pd.Series(float("nan"), index=df.index)
+    return pd.to_numeric(df[column], errors="coerce")
+
+def prepare_conversation_frame(df):
+    """Parse the analytics sheet's columns into typed ones; rows without a valid timestamp are dropped."""
+    df = df.copy()
+    df["Timestamp"] = pd.to_datetime(df.get("Timestamp"), format="%Y-%m-%d %H-%M-%S", errors="coerce")
+    df = df[df["Timestamp"].notnull()]
+    df["Rating"] = _numeric(df, "Rating")
+    for field in ["Employee Messages", "Customer Messages", "Conversation Length"]:
+        df[field] = _numeric(df, field).fillna(0)
+    df["Escalation"] = df["Escalation"].fillna("No") if "Escalation" in df.columns else "No"
+    for field in SCORE_FIELDS:
+        df[field] = _numeric(df, field)
+    if "Escalation Handling" not in df.columns:
+        df["Escalation Handling"] = "N/A"
+    return df
+
+def conversation_summary(df):
+    """Headline numbers and chart series for a frame from `prepare_conversation_frame`."""
+    return {
+        "conversations": len(df),
+        "avg_rating": df["Rating"].mean(),
+        "avg_length": df["Conversation Length"].mean(),
+        "daily": df.groupby(df["Timestamp"].dt.date).size(),
+        "messages_by_role": {
+            "Employee": df["Employee Messages"].sum(),
+            "Customer": df["Customer Messages"].sum(),
+        },
+        "escalation_rate": (df["Escalation"] == "Yes").sum() / len(df) * 100 if len(df) else 0.0,
+        "score_trend": df.set_index("Timestamp")[SCORE_FIELDS].resample("W").mean(),
+        "escalation_handling": df["Escalation Handling"].value_counts(),
+    }
+
+def prepare_usage_frame(df):
+    """Rows with token/cost columns, parsed to numbers; rows logged before usage tracking are dropped."""
+    if "Cost (USD)" not in df.columns:
+        return df.iloc[0:0]
+    usage = df.copy()
+    for field in USAGE_FIELDS:
+        usage[field] = _numeric(usage, field)
+    return usage[usage["Requests"] > 0]
+
+def top_consumers(usage, group_by, limit=10):
+    """Sessions, cost, tokens and generation speed per value of `group_by`, most expensive first."""
+    usage = usage.assign(**{group_by: usage[group_by].replace("", "(none)")})
+    top = usage.groupby(group_by).agg(
+        Sessions=("Cost (USD)", "size"),
+        Total_Cost=("Cost (USD)", "sum"),
+        Avg_Cost=("Cost (USD)", "mean"),
+        Avg_Prompt_Tokens=("Prompt Tokens", "mean"),
+        Avg_Completion_Tokens=("Completion Tokens", "mean"),
+        Completion_Tokens=("Completion Tokens", "sum"),
+        Model_Seconds=("Model Seconds", "sum"),
+    )
+    top["Tokens / Sec"] = top.pop("Completion_Tokens") / top.pop("Model_Seconds").clip(lower=1e-9)
+    top = top.sort_values("Total_Cost", ascending=False).head(limit)
+    top.columns = [column.replace("_", " ") for column in top.columns]
+    return top
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from session_memory import Turn
+
+# Synthetic inputs shaped like the real thing: chat turns, coaching replies, analytics sheet rows, mic frames
+EMPLOYEE_LINES = [
+    "Hi there, I'm sorry to hear that. Can you tell me what you ordered?",
+    "Thank you for your patience, I'll get a fresh burger started for you right away.",
+    "I can remake that with no pickles, it will only take a couple of minutes.",
+    "I understand, let me get my manager so we can sort this out for you.",
+    "Would you like a refund for the drink or a replacement?",
+]
+CUSTOMER_LINES = [
+    "I ordered a Double Cheeseburger with no pickles and it's covered in pickles.",
+    "My fries were soggy and half of them were missing from the bag.",
+    "I've been waiting twenty minutes and the burger is cold. This is ridiculous.",
+    "Can I speak to a manager? I want this fixed properly.",
+    "Fine, but I want a large Coke with that and some extra ketchup packets.",
+]
+SCENARIOS = [
+    "I got the wrong drink and I'm in a rush.",
+    "My fries were soggy and missing from the bag.",
+    "I ordered no pickles and my burger had extra pickles.",
+    "I was overcharged and my receipt shows an incorrect amount.",
+]
+PERSONALITIES = ["Impatient", "Polite", "Angry", "Confused"]
+ROLES = ["Crew", "Manager"]
+CATEGORIES = ["Rule Compliance", "Escalation Handling", "Professionalism", "Clarity"]
+
+def conversation(turns, seed=0):
+    """`turns` alternating customer/employee turns, starting with the customer."""
+    rng = np.random.default_rng(seed)
+    return [
+        Turn("customer", CUSTOMER_LINES[rng.integers(len(CUSTOMER_LINES))]) if i % 2 == 0
+        else Turn("employee", EMPLOYEE_LINES[rng.integers(len(EMPLOYEE_LINES))])
+        for i in range(turns)
+    ]
+
+def coaching_reply(points, seed=0):
+    """A coach reply with `points` bullet points followed by the `=== Scores ===` block."""
+    rng = np.random.default_rng(seed)
+    bullets = [
+        f"- **{CATEGORIES[i % 4]}**: The employee said \"{EMPLOYEE_LINES[rng.integers(len(EMPLOYEE_LINES))]}\", "
+        f"which {'helped' if rng.random() > 0.5 else 'did not help'} the customer. (Score: {rng.integers(1, 6)}/5)"
+        for i in range(points)
+    ]
+    scores = [f"{category}: {'Pass' if category == 'Escalation Handling' else rng.integers(1, 6)}" for category in CATEGORIES]
+    return "\n".join(bullets) + "\n\n=== Scores ===\n" + "\n".join(scores) + "\n"
+
+def _with_blanks(rng, values, fraction):
+    # Sheet cells that were never filled come back as "" from get_all_records
+    values = values.astype(object)
+    values[rng.random(len(values)) < fraction] = ""
+    return values
+
+def sheet_frame(rows, seed=0):
+    """Analytics sheet rows as `pd.DataFrame(get_all_records())` returns them (ints, floats and "" blanks)."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2025-01-01T08:00:00")
+    timestamps = pd.DatetimeIndex(start + rng.integers(0, 600 * 86400, rows).astype("timedelta64[s]"))
+    timestamp_text = timestamps.strftime("%Y-%m-%d %H-%M-%S").to_numpy(dtype=object)
+    timestamp_text[rng.random(rows) < 0.001] = "not a date"
+    employee = rng.integers(1, 12, rows)
+    customer = employee + rng.integers(0, 2, rows)
+    prompt_tokens = rng.integers(2_000, 40_000, rows)
+    completion_tokens = rng.integers(100, 2_000, rows)
+    return pd.DataFrame({
+        "Filename": [f"conversation_{i:08d}.txt" for i in range(rows)],
+        "Timestamp": timestamp_text,
+        "Rating": _with_blanks(rng, rng.integers(1, 6, rows), 0.3),
+        "Drive Link": "https://drive.google.com/file/d/placeholder/view",
+        "Employee Messages": employee,
+        "Customer Messages": customer,
+        "Conversation Length": employee + customer,
+        "Escalation": rng.choice(["Yes", "No"], rows, p=[0.2, 0.8]).astype(object),
+        "Rule Compliance": _with_blanks(rng, rng.integers(1, 6, rows), 0.05),
+        "Escalation Handling": rng.choice(["Pass", "Fail", "N/A"], rows, p=[0.7, 0.2, 0.1]).astype(object),
+        "Professionalism": _with_blanks(rng, rng.integers(1, 6, rows), 0.05),
+        "Clarity": _with_blanks(rng, rng.integers(1, 6, rows), 0.05),
+        "Scenario": rng.choice(SCENARIOS, rows).astype(object),
+        "Personality": rng.choice(PERSONALITIES, rows).astype(object),
+        "Role": rng.choice(ROLES, rows).astype(object),
+        "Trainee": rng.choice(["", "t001", "t002", "t003", "t004"], rows).astype(object),
+        "Requests": _with_blanks(rng, employee + 1, 0.1),
+        "Prompt Tokens": prompt_tokens,
+        "Completion Tokens": completion_tokens,
+        "Model Seconds": np.round(completion_tokens / rng.uniform(40, 90, rows), 2),
+        "Cost (USD)": np.round((prompt_tokens * 2.5 + completion_tokens * 10) / 1_000_000, 5),
+    })
+
+def audio_frames(seconds, sample_rate=48000, frame_ms=20, seed=0):
+    """Mono 16-bit frames as `av.AudioFrame.to_ndarray()` yields them from the browser mic (shape 1 x samples)."""
+    rng = np.random.default_rng(seed)
+    samples = sample_rate * frame_ms // 1000
+    count = seconds * 1000 // frame_ms
+    return [rng.integers(-3000, 3000, (1, samples), dtype=np.int16) for _ in range(count)]
@@ -0,0 +1,169 @@
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+# Micro-benchmarks for the app's hot functions: wall time and peak traced memory per input size,
+# compared against a stored baseline.
+#
+#   python benchmarks/run.py                    compare against benchmarks/baseline.json
+#   python benchmarks/run.py --update-baseline  record a new baseline
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # data/ is read with relative paths
+os.environ.setdefault("SESSION_SPILL_DIR", tempfile.mkdtemp(prefix="bench-sessions-"))
+
+import stubs
+stubs.install()
+
+import generators
+from conversation_engine import Session, format_conversation_for_openai, parse_coaching_feedback
+from analytics import prepare_conversation_frame, conversation_summary, prepare_usage_frame, top_consumers
+from voice_recorder import AudioProcessor
+
+ROW_SIZES = [10_000, 100_000, 1_000_000]
+_frames = {}
+
+def sheet_frame(rows):
+    # Generated once per size and shared by the analytics cases
+    if rows not in _frames:
+        _frames[rows] = generators.sheet_frame(rows)
+    return _frames[rows]
+
+def session_with(turns):
+    return Session(
+        session_id="benchmark",
+        scenario=generators.SCENARIOS[0],
+        personality=generators.PERSONALITIES[0],
+        history=generators.conversation(turns),
+    )
+
+def filled_processor(frames):
+    processor = AudioProcessor()
+    for frame in frames:
+        processor.q.put(frame)
+    return processor
+
+class Case:
+    """`setup(size)` builds the input once; `per_run(input)` (if given) runs untimed before every call."""
+
+    def __init__(self, name, sizes, setup, func, per_run=None, unit=""):
+        self.name = name
+        self.sizes = sizes
+        self.setup = setup
+        self.func = func
+        self.per_run = per_run
+        self.unit = unit
+
+CASES = [
+    Case("format_conversation_for_openai", [10, 100, 1000], session_with, format_conversation_for_openai, unit="turns"),
+    Case("parse_coaching_feedback", [4, 40, 400], generators.coaching_reply, parse_coaching_feedback, unit="points"),
+    Case("prepare_conversation_frame", ROW_SIZES, sheet_frame, prepare_conversation_frame, unit="rows"),
+    Case("conversation_summary", ROW_SIZES, lambda rows: prepare_conversation_frame(sheet_frame(rows)),
+         conversation_summary, unit="rows"),
+    Case("prepare_usage_frame", ROW_SIZES, sheet_frame, prepare_usage_frame, unit="rows"),
+    Case("top_consumers", ROW_SIZES, lambda rows: prepare_usage_frame(sheet_frame(rows)),
+         lambda usage: top_consumers(usage, "Scenario"), unit="rows"),
+    Case("AudioProcessor.get_audio_data", [10, 60, 600], generators.audio_frames,
+         lambda processor: processor.get_audio_data(), per_run=filled_processor, unit="s audio"),
+]
+
+def measure(case, data, max_repeats=10, budget=2.0):
+    """Best wall time over up to `max_repeats` runs (fewer for slow inputs), then one traced run for peak memory."""
+    times = []
+    while len(times) < max_repeats and sum(times) < budget:
+        arg = case.per_run(data) if case.per_run else data
+        gc.collect()
+        started = time.perf_counter()
+        case.func(arg)
+        times.append(time.perf_counter() - started)
+
+    arg = case.per_run(data) if case.per_run else data
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak, "runs": len(times)}
+
+def run_cases(selected, max_size=None):
+    results = {}
+    for case in selected:
+        for size in case.sizes:
+            if max_size and size > max_size:
+                continue
+            data = case.setup(size)
+            key = f"{case.name}[{size}]"
+            results[key] = measure(case, data)
+            result = results[key]
+            print(f"{key:<45} {result['seconds'] * 1000:>10.2f} ms {result['peak_bytes'] / 1024:>12,.0f} KB"
+                  f"  ({result['runs']} runs, {size:,} {case.unit})", flush=True)
+        _frames.clear()
+    return results
+
+def compare(results, baseline, time_tolerance, memory_tolerance, min_seconds):
+    """Describe every case whose time or peak memory grew past the tolerances."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        slower = result["seconds"] > base["seconds"] * (1 + time_tolerance) and \
+            result["seconds"] - base["seconds"] > min_seconds
+        larger = result["peak_bytes"] > base["peak_bytes"] * (1 + memory_tolerance)
+        if slower or larger:
+            regressions.append(
+                f"{key}: {base['seconds'] * 1000:.2f} -> {result['seconds'] * 1000:.2f} ms, "
+                f"{base['peak_bytes'] / 1024:,.0f} -> {result['peak_bytes'] / 1024:,.0f} KB"
+            )
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot functions")
+    parser.add_argument("--only", help="run cases whose name contains this text")
+    parser.add_argument("--max-size", type=int, help="skip inputs larger than this (e.g. 100000 for a quick run)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="allowed slowdown (0.5 = 50%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2, help="allowed peak memory growth")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="ignore slowdowns smaller than this")
+    parser.add_argument("--out", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    selected = [case for case in CASES if not args.only or args.only in case.name]
+    results = run_cases(selected, args.max_size)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        sys.exit(0)
+
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance, args.min_seconds)
+    missing = [key for key in results if key not in baseline]
+    if missing:
+        print(f"No baseline for: {', '.join(missing)}")
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline.")
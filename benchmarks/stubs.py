@@ -0,0 +1,44 @@
+import sys
+import types
+
+# Stand-ins for Streamlit, streamlit-webrtc, PyAV, pydub and Google so benchmarks import the app's modules
+# without a browser, credentials or network
+
+class _Anything:
+    """Accepts any attribute access or call and returns itself."""
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    module.__getattr__ = lambda attr: _Anything()
+    return module
+
+def _offline(*args, **kwargs):
+    raise RuntimeError("Network calls are disabled in benchmarks")
+
+def install():
+    sys.modules["streamlit"] = _module("streamlit", secrets={})
+    sys.modules["streamlit_webrtc"] = _module(
+        "streamlit_webrtc",
+        AudioProcessorBase=object,
+        WebRtcMode=types.SimpleNamespace(SENDONLY="sendonly"),
+        webrtc_streamer=_Anything(),
+    )
+    sys.modules["av"] = _module("av", AudioFrame=object)
+    sys.modules["pydub"] = _module("pydub", AudioSegment=_Anything())
+    sys.modules["google_utils"] = _module(
+        "google_utils",
+        upload_text_to_drive=_offline,
+        append_to_sheet=_offline,
+        get_sheet=_offline,
+        list_files_in_folder=_offline,
+    )
+
+    import openai_client
+    openai_client.get_client = _offline
@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import uuid
+import hashlib
+import zipfile
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from chart_utils import category_counts
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are then only serialized within this process
+    fcntl = None
+
+# Feedback chart report: rendered in worker processes, cached by input-data hash
+REPORT_DIR = os.getenv("REPORT_DIR", os.path.join("reports", "feedback_charts"))
+ARCHIVE_NAME = "feedback_report.zip"
+MANIFEST_NAME = "manifest.json"
+CHART_VERSION = 2  # bump when a renderer changes so cached charts are redrawn
+LOCK_NAME = ".lock"
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_build_lock = threading.Lock()
+
+def _init_worker():
+    # Headless rendering; workers never touch a display
+    os.environ["MPLBACKEND"] = "Agg"
+
+def _new_figure():
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(8, 5))
+    return fig, fig.add_subplot()
+
+def render_rating_trend(df, path):
+    fig, ax = _new_figure()
+    rating_trend = df.groupby(df["Timestamp"].dt.to_period("M"))["Rating"].mean()
+    rating_trend.index = rating_trend.index.to_timestamp()
+    ax.plot(rating_trend.index, rating_trend, marker="o")
+    ax.set_title("Average Experience Rating Over Time")
+    ax.set_ylabel("Rating")
+    ax.set_xlabel("Month")
+    fig.savefig(path)
+
+def render_ai_quality(df, path):
+    fig, ax = _new_figure()
+    df["AI Quality"].value_counts().plot(kind="bar", ax=ax)
+    ax.set_title("AI Response Quality Distribution")
+    ax.set_ylabel("Responses")
+    ax.set_xlabel("Quality")
+    fig.savefig(path)
+
+def render_learning(df, path):
+    fig, ax = _new_figure()
+    df["Learning"].value_counts().plot(kind="pie", autopct="%1.1f%%", ax=ax)
+    ax.set_title("Learning Value")
+    fig.savefig(path)
+
+def _plotly_counts(series, title, path):
+    # Same bar chart the dashboard shows; saved as standalone HTML (no image export engine needed)
+    import plotly.express as px
+    counts = category_counts(series)
+    fig = px.bar(
+        x=counts.index.astype(str),
+        y=counts.values,
+        labels={'x': series.name or 'Category', 'y': 'Count'},
+        color=counts.index.astype(str),
+        title=title
+    )
+    fig.write_html(path, include_plotlyjs="cdn")
+
+def render_duration(df, path):
+    _plotly_counts(df["Duration"], "Duration on Feedback", path)
+
+def render_rating_counts(df, path):
+    _plotly_counts(df["Rating"], "Experience Ratings", path)
+
+# (output file, input columns, renderer)
+CHARTS = [
+    ("average_rating_over_time.png", ["Timestamp", "Rating"], render_rating_trend),
+    ("ai_quality_distribution.png", ["AI Quality"], render_ai_quality),
+    ("learning_value.png", ["Learning"], render_learning),
+    ("duration_on_feedback.html", ["Duration"], render_duration),
+    ("experience_ratings.html", ["Rating"], render_rating_counts),
+]
+
+def prepare_feedback_frame(df):
+    df = df.copy()
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+    for column in ["Rating", "Duration"]:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df
+
+def data_hash(name, frame):
+    """Hash of a chart's input columns, so unchanged charts are not redrawn."""
+    digest = hashlib.sha256(f"{CHART_VERSION}:{name}".encode("utf-8"))
+    digest.update(",".join(frame.columns).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return digest.hexdigest()
+
+def _render(job):
+    renderer, frame, path = job
+    # Written under a temporary name so a concurrent reader never sees a half-written chart
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+    renderer(frame, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+class _ReportLock:
+    """Serializes builds sharing an export directory, across threads and processes."""
+
+    def __init__(self, export_dir):
+        self.path = os.path.join(export_dir, LOCK_NAME)
+
+    def __enter__(self):
+        _build_lock.acquire()
+        try:
+            self.file = open(self.path, "a")
+            if fcntl:
+                fcntl.flock(self.file, fcntl.LOCK_EX)
+        except BaseException:
+            _build_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+        _build_lock.release()
+
+def build_chart_report(df, export_dir=REPORT_DIR, max_workers=None):
+    """Render all feedback charts in parallel and bundle them into one zip archive.
+
+    Returns (archive_path, chart_paths).
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    with _ReportLock(export_dir):
+        chart_paths, _, _, up_to_date = _plan(prepare_feedback_frame(df), export_dir)
+        if not up_to_date:
+            _run_renderer(df, export_dir, max_workers)
+    return os.path.join(export_dir, ARCHIVE_NAME), chart_paths
+
+def _run_renderer(df, export_dir, max_workers):
+    # Rendering runs in a separate `python -m chart_report` process. A worker pool started from the
+    # Streamlit server would re-import sys.modules["__main__"] (main.py, i.e. the whole app) in every
+    # spawn/forkserver worker, and forking the multi-threaded server can deadlock the workers.
+    input_path = os.path.join(export_dir, f".input.{uuid.uuid4().hex}.pkl")
+    df.to_pickle(input_path)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [MODULE_DIR, os.environ.get("PYTHONPATH")])))
+    command = [sys.executable, "-m", "chart_report", input_path, export_dir]
+    if max_workers:
+        command += ["--max-workers", str(max_workers)]
+    try:
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+    finally:
+        os.remove(input_path)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"chart renderer exited with {result.returncode}")
+
+def _plan(df, export_dir):
+    """Chart paths, render jobs for charts whose inputs changed, their hashes, and whether all is current."""
+    try:
+        with open(os.path.join(export_dir, MANIFEST_NAME), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        manifest = {}
+
+    chart_paths, jobs, new_hashes = [], [], {}
+    for filename, columns, renderer in CHARTS:
+        if not all(column in df.columns for column in columns):
+            continue
+        frame = df[columns]
+        path = os.path.join(export_dir, filename)
+        chart_paths.append(path)
+        new_hashes[filename] = data_hash(filename, frame)
+        if manifest.get(filename) != new_hashes[filename] or not os.path.exists(path):
+            jobs.append((renderer, frame, path))
+
+    up_to_date = not jobs and manifest == new_hashes and os.path.exists(os.path.join(export_dir, ARCHIVE_NAME))
+    return chart_paths, jobs, new_hashes, up_to_date
+
+def _build(df, export_dir, max_workers=None):
+    # Runs in the renderer process; build_chart_report holds the directory lock meanwhile
+    chart_paths, jobs, new_hashes, up_to_date = _plan(prepare_feedback_frame(df), export_dir)
+    if up_to_date:
+        return
+
+    if jobs:
+        workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            list(pool.map(_render, jobs))
+
+    archive_path = os.path.join(export_dir, ARCHIVE_NAME)
+    tmp_path = f"{archive_path}.{uuid.uuid4().hex}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path in chart_paths:
+            archive.write(path, arcname=os.path.basename(path))
+    os.replace(tmp_path, archive_path)
+    with open(os.path.join(export_dir, MANIFEST_NAME), "w", encoding="utf-8") as file:
+        json.dump(new_hashes, file, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the feedback chart report (started by build_chart_report)")
+    parser.add_argument("input", help="pickled feedback DataFrame")
+    parser.add_argument("export_dir")
+    parser.add_argument("--max-workers", type=int)
+    args = parser.parse_args()
+
+    _build(pd.read_pickle(args.input), args.export_dir, args.max_workers)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# Keep dashboard chart payloads bounded as history grows
+MAX_BARS = 30
+MAX_LINE_POINTS = 500
+
+def auto_bin_count(data):
+    """Number of bins numpy's `bins="auto"` would use, without building the edges.
+
+    One outlier can make that hundreds of millions of bins, so it is capped before any edges exist.
+    """
+    n, span = len(data), np.ptp(data) if len(data) else 0.0
+    if n < 2 or span == 0:
+        return 1
+    sturges = span / (np.log2(n) + 1.0)
+    iqr = np.subtract(*np.percentile(data, [75, 25]))
+    fd = 2.0 * iqr * n ** (-1.0 / 3.0)
+    width = min(fd, sturges) if fd else sturges
+    return int(np.ceil(span / width))
+
+def category_counts(series, max_bins=MAX_BARS):
+    """Counts per value, or per histogram bin for numeric series with many distinct values.
+
+    Returns a Series indexed by display label, in sorted order.
+    """
+    values = pd.to_numeric(series, errors="coerce") if series.dtype == object else series
+    if not pd.api.types.is_numeric_dtype(values) or values.nunique() <= max_bins:
+        return series.value_counts().sort_index()
+
+    data = values.dropna().to_numpy(dtype=float)
+    counts, edges = np.histogram(data, bins=min(auto_bin_count(data), max_bins))
+    labels = [f"{lo:g}–{hi:g}" for lo, hi in zip(edges[:-1], edges[1:])]
+    return pd.Series(counts, index=pd.Index(labels, name=series.name), name=series.name)
+
+def lttb_downsample(series, threshold=MAX_LINE_POINTS):
+    """Largest-Triangle-Three-Buckets downsampling of a sorted time/number-indexed Series."""
+    n = len(series)
+    if threshold >= n or threshold < 3:
+        return series
+
+    index = series.index
+    if isinstance(index, pd.DatetimeIndex) or pd.api.types.is_datetime64_any_dtype(index):
+        x = index.asi8.astype(float)
+    elif pd.api.types.infer_dtype(index) in ("date", "datetime", "datetime64"):
+        x = pd.to_datetime(index).asi8.astype(float)
+    elif pd.api.types.is_numeric_dtype(index):
+        x = index.to_numpy(dtype=float)
+    else:
+        # Labels are evenly spaced; parsing them as dates would fall back to dateutil per element
+        x = np.arange(n, dtype=float)
+    y = series.to_numpy(dtype=float)
+
+    # Bucket boundaries for the n - 2 interior points
+    bounds = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        next_start, next_end = bounds[i + 1], bounds[i + 2] if i + 2 < len(bounds) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Point in this bucket forming the largest triangle with the previous pick and next bucket's mean
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return series.iloc[selected]
@@ -0,0 +1,511 @@
+import os
+import json
+import time
+import uuid
+import wave
+import random
+import asyncio
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from openai_client import get_client, request_slot, estimate_cost, estimate_audio_cost
+from response_cache import response_cache
+from opener_pack import pick_opener
+from menu_index import MenuIndex
+from session_memory import (
+    Turn, TurnLog, IDLE_SECONDS, PARKED_SECONDS, MAX_CALLS_PER_SESSION, session_registry, sweep_spill_files,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: file stores then only guard against writers in this process
+    fcntl = None
+
+# Headless conversation engine: no Streamlit imports, all state lives on a Session
+MODEL = 'gpt-4o'
+TRANSCRIBE_MODEL = "whisper-1"
+
+# Fixed sampling so testing mode runs are reproducible and can be replayed
+TEST_SAMPLING = {"temperature": 0, "seed": 427}
+
+DEFAULT_OPENER = "Hi, can I speak to someone about an issue with my order?"
+SCORE_CATEGORIES = ["Rule Compliance", "Escalation Handling", "Professionalism", "Clarity"]
+ESCALATION_KEYWORDS = ["manager", "escalate", "supervisor", "complain", "issue"]
+
+def load_data(name):
+    with open(os.path.join("data", name), "r") as file:
+        return json.load(file)
+
+menu = load_data("menu.json")
+rules = load_data("rules.json")
+scenarios_data = load_data("scenarios.json")
+menu_index = MenuIndex(menu)
+
+# Turns scanned (with the scenario) when choosing which menu sections to send
+MENU_CONTEXT_TURNS = 4
+
+def menu_context(session):
+    """Only the menu items and sections the scenario and recent turns mention (full menu if none)."""
+    recent = " ".join(turn.content for turn in session.history[-MENU_CONTEXT_TURNS:])
+    return menu_index.select(f"{session.scenario} {recent}")
+
+def new_usage():
+    return {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency_s": 0.0, "cost": 0.0}
+
+@dataclass
+class Session:
+    session_id: str
+    scenario: str
+    personality: str
+    role: str = "Crew"
+    trainee: str = None
+    history: TurnLog = field(default_factory=TurnLog)
+    feedback: str = None
+    scores: dict = field(default_factory=dict)
+    provisional: dict = None
+    testing_mode: bool = False
+    opener_audio: str = None
+    usage: dict = field(default_factory=new_usage)
+    calls: list = field(default_factory=list)  # usage records of the latest model calls; totals are in `usage`
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    version: int = 0  # bumped on every write to a FileSessionStore, for compare-and-swap
+
+    def __post_init__(self):
+        if not isinstance(self.history, TurnLog):
+            self.history = TurnLog(Turn.from_dict(turn) if isinstance(turn, dict) else turn for turn in self.history)
+        session_registry.register(self)
+
+    def to_dict(self):
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["history"] = [turn.to_dict() for turn in self.history]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+def new_session(role="Crew", scenario=None, personality=None, testing_mode=False, trainee=None):
+    """Create a session with a scenario, personality and the customer's opening line."""
+    session = Session(
+        session_id=uuid.uuid4().hex,
+        scenario=scenario or random.choice(scenarios_data["scenarios"]),
+        personality=personality or random.choice(scenarios_data["personalities"]),
+        role=role,
+        trainee=trainee or None,
+        testing_mode=testing_mode,
+    )
+    # Serve a pre-generated opener for this scenario/personality when the pack is built;
+    # testing mode always gets the same one so its replays match the recorded requests
+    opener = pick_opener(session.scenario, session.personality, fixed=testing_mode)
+    init_message, session.opener_audio = opener or (DEFAULT_OPENER, None)
+    session.history.append(Turn("customer", init_message))
+    return session
+
+# System message to define the AI's role
+def format_conversation_for_openai(session):
+    """Convert internal roles to valid OpenAI roles."""
+    system_message = (
+        f"You are a {session.personality} customer at BurgerXpress. "
+        f"Your issue is: '{session.scenario}'\n"
+        "React naturally with tone and behavior that matches your personality. "
+        "Use the menu to support your complaint. "
+        "If the situation escalates too much and the employee is crew, they should call a manager.\n"
+        "Here is the menu data:\n\n" + json.dumps(menu_context(session))
+    )
+
+    messages = [{"role": "system", "content": system_message}]
+    for turn in session.history:
+        if turn.role == "employee":
+            messages.append({"role": "user", "content": turn.content})
+        elif turn.role == "customer":
+            messages.append({"role": "assistant", "content": turn.content})
+    return messages
+
+def usage_record(kind, response_usage=None, latency=0.0, waited=0.0, cached=False, model=MODEL, cost=None):
+    """Tokens, model time and estimated cost of one call (cache replays cost nothing).
+
+    `cost` overrides the token-based estimate, e.g. for audio billed per minute.
+    """
+    prompt_tokens = response_usage.prompt_tokens if response_usage else 0
+    completion_tokens = response_usage.completion_tokens if response_usage else 0
+    return {
+        "kind": kind,
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "latency_s": round(latency, 3),
+        "queued_s": round(waited, 3),
+        "cost": estimate_cost(model, prompt_tokens, completion_tokens) if cost is None else cost,
+        "cached": cached,
+        "at": time.time(),
+    }
+
+def add_usage(usage, record):
+    if not record["cached"]:
+        usage["requests"] += 1
+    for key in ("prompt_tokens", "completion_tokens", "latency_s", "cost"):
+        # Sessions saved before latency/cost were tracked lack those keys
+        usage[key] = usage.get(key, 0) + record[key]
+
+def record_usage(usage, calls, record):
+    if usage is not None:
+        add_usage(usage, record)
+    if calls is not None:
+        calls.append(record)
+        # Keep per-call detail bounded; the totals in `usage` still cover every call
+        del calls[:-MAX_CALLS_PER_SESSION]
+
+def complete_chat(messages, stream=False, testing_mode=False, on_wait=None, usage=None, calls=None, kind="chat"):
+    """Send a chat request and return (reply_text, seconds_queued).
+
+    In testing mode, identical requests are replayed from the on-disk response cache.
+    Token counts, model time and cost are added to `usage` and a per-call record
+    is appended to `calls` when given.
+    """
+    params = TEST_SAMPLING if testing_mode else {}
+    cache_key = None
+    if params:
+        cache_key = response_cache.make_key(MODEL, messages, **params)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            record_usage(usage, calls, usage_record(kind, cached=True))
+            return cached, 0.0
+
+    with request_slot(on_wait=on_wait) as waited:
+        started = time.perf_counter()
+        if stream:
+            response = get_client().chat.completions.create(
+                model=MODEL, messages=messages, stream=True, stream_options={"include_usage": True}, **params
+            )
+            content = ""
+            response_usage = None
+            for chunk in response:
+                if chunk.choices:
+                    content += chunk.choices[0].delta.content or ''
+                if getattr(chunk, "usage", None):
+                    response_usage = chunk.usage  # final chunk carries the totals
+        else:
+            response = get_client().chat.completions.create(model=MODEL, messages=messages, **params)
+            content = response.choices[0].message.content
+            response_usage = response.usage
+        latency = time.perf_counter() - started
+    record_usage(usage, calls, usage_record(kind, response_usage, latency, waited))
+
+    if cache_key:
+        response_cache.put(cache_key, content)
+    return content, waited
+
+def audio_seconds(path):
+    try:
+        with wave.open(path, "rb") as audio:
+            return audio.getnframes() / audio.getframerate()
+    except (OSError, wave.Error, EOFError):
+        return 0.0
+
+def transcribe(audio_path, on_wait=None, usage=None, calls=None):
+    """Transcribe a recorded message and return (text, seconds_queued); usage is recorded like a chat call's."""
+    with open(audio_path, "rb") as audio_file, request_slot(on_wait=on_wait) as waited:
+        started = time.perf_counter()
+        transcript = get_client().audio.transcriptions.create(model=TRANSCRIBE_MODEL, file=audio_file)
+        latency = time.perf_counter() - started
+    cost = estimate_audio_cost(TRANSCRIBE_MODEL, audio_seconds(audio_path))
+    record_usage(usage, calls, usage_record("transcription", latency=latency, waited=waited,
+                                            model=TRANSCRIBE_MODEL, cost=cost))
+    return transcript.text, waited
+
+def customer_reply(session, employee_message, on_wait=None):
+    """Record the employee's message and return the simulated customer's reply."""
+    session.history.append(Turn("employee", employee_message))
+    reply, waited = complete_chat(
+        format_conversation_for_openai(session), stream=True, testing_mode=session.testing_mode,
+        on_wait=on_wait, usage=session.usage, calls=session.calls, kind="customer",
+    )
+    session.history.append(Turn("customer", reply))
+    session.updated_at = time.time()
+    return reply, waited
+
+def coaching_prompt(history):
+    return (
+        "You are a customer service coach analyzing a spoken conversation between an employee and a customer. "
+        "Focus on the employee's professionalism, clarity, tone, and escalation decisions — not grammar or punctuation. "
+        "The employee is speaking, not writing.\n\n"
+        "Return coaching feedback as a bullet-pointed list. Each point should be clear and reference the employee's actions or language. "
+        "Include one point per score category, with explanation and the score at the end like this:\n"
+        "- **Rule Compliance**: [explanation] (Score: 4/5)\n"
+        "- **Escalation Handling**: [explanation] (Score: Pass)\n"
+        "- **Professionalism**: [explanation] (Score: 3/5)\n"
+        "- **Clarity**: [explanation] (Score: 5/5)\n\n"
+        "At the end of your feedback, include a clear breakdown of the scores again, exactly like this:\n\n"
+        "=== Scores ===\n"
+        "Rule Compliance: 4\n"
+        "Escalation Handling: Pass\n"
+        "Professionalism: 3\n"
+        "Clarity: 5\n\n"
+        "Here is the conversation:\n" +
+        "\n".join([f"{turn.role.capitalize()}: {turn.content}" for turn in history])
+    )
+
+def parse_coaching_feedback(content):
+    """Split the coach's reply into the summary text and the `=== Scores ===` block."""
+    summary, scores_block = content.strip().split("=== Scores ===")
+    scores = {}
+    for line in scores_block.strip().splitlines():
+        if ":" in line:
+            key, val = line.split(":", 1)
+            scores[key.strip()] = val.strip()
+    return {"summary": summary.strip(), "scores": scores}
+
+# Function to generate coaching feedback
+def generate_coaching_feedback(session, on_wait=None):
+    """Score the session with the coaching rubric and store the result on it."""
+    if len(session.history) < 3:
+        result = {
+            "summary": "Conversation was too short to generate useful coaching feedback.",
+            "scores": {category: "N/A" for category in SCORE_CATEGORIES}
+        }
+    else:
+        try:
+            content, _ = complete_chat(
+                [{"role": "system", "content": coaching_prompt(session.history)}],
+                testing_mode=session.testing_mode,
+                on_wait=on_wait,
+                usage=session.usage,
+                calls=session.calls,
+                kind="coaching",
+            )
+            result = parse_coaching_feedback(content)
+        except Exception as e:
+            result = {
+                "summary": f"An error occurred: {e}",
+                "scores": {category: "N/A" for category in SCORE_CATEGORIES},
+                "error": str(e),
+            }
+
+    session.feedback = result["summary"]
+    session.scores = result["scores"]
+    session.updated_at = time.time()
+    return result
+
+def conversation_stats(history):
+    """Message counts and escalation flag logged with every conversation."""
+    employee_msgs = 0
+    customer_msgs = 0
+    escalation_flag = "No"
+    for turn in history:
+        if turn.role == "employee":
+            employee_msgs += 1
+        elif turn.role == "customer":
+            customer_msgs += 1
+        if any(keyword in turn.content.lower() for keyword in ESCALATION_KEYWORDS):
+            escalation_flag = "Yes"
+    return {
+        "employee_msgs": employee_msgs,
+        "customer_msgs": customer_msgs,
+        "length": len(history),
+        "escalation": escalation_flag,
+    }
+
+class InMemorySessionStore:
+    """Sessions held in this process only."""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def put(self, session):
+        with self._lock:
+            self._sessions[session.session_id] = session
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def reap(self, idle_seconds=IDLE_SECONDS):
+        """Drop sessions untouched for `idle_seconds`. Returns their ids."""
+        cutoff = time.time() - idle_seconds
+        with self._lock:
+            expired = [sid for sid, session in self._sessions.items() if session.updated_at < cutoff]
+            for session_id in expired:
+                del self._sessions[session_id]
+        session_registry.record_reaped(len(expired))
+        return expired
+
+class SessionConflict(Exception):
+    """The session was written by another worker since it was read."""
+
+class FileSessionStore:
+    """One JSON file per session in a directory shared by all engine workers.
+
+    Writes are compare-and-swap: `put` fails with `SessionConflict` if the stored session's
+    version changed since it was read, so concurrent turns on different workers can't
+    silently overwrite each other.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, ".lock")
+        self._thread_lock = threading.Lock()
+
+    def _path(self, session_id):
+        return os.path.join(self.directory, f"{session_id}.json")
+
+    @contextmanager
+    def _locked(self):
+        # Held only for the version check and write, never across a model call
+        with self._thread_lock, open(self._lock_path, "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _read(self, session_id):
+        try:
+            with open(self._path(session_id), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, session_id):
+        data = self._read(session_id)
+        return Session.from_dict(data) if data is not None else None
+
+    def put(self, session):
+        with self._locked():
+            stored = self._read(session.session_id)
+            if stored is not None and stored.get("version", 0) != session.version:
+                raise SessionConflict(session.session_id)
+            session.version += 1
+            tmp_path = self._path(session.session_id) + f".{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(session.to_dict(), file, ensure_ascii=False)
+            os.replace(tmp_path, self._path(session.session_id))
+
+    def delete(self, session_id):
+        try:
+            os.remove(self._path(session_id))
+        except OSError:
+            pass
+
+    def reap(self, idle_seconds=IDLE_SECONDS):
+        """Delete session files not written for `idle_seconds`. Returns their ids."""
+        cutoff = time.time() - idle_seconds
+        expired = []
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+        except OSError:
+            return expired
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    expired.append(entry.name[:-len(".json")])
+            except OSError:
+                pass
+        return expired
+
+class TieredSessionStore:
+    """Sessions in memory while in use; idle ones are parked as JSON on disk and reloaded on access."""
+
+    def __init__(self, directory, parked_seconds=PARKED_SECONDS):
+        self.memory = {}
+        self.parked = FileSessionStore(directory)
+        self.parked_seconds = parked_seconds
+        self._touched = {}  # session_id -> last get/put, so a session in use is never parked mid-turn
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            session = self.memory.get(session_id)
+            if session is None:
+                session = self.parked.get(session_id)
+                if session is None:
+                    return None
+                self.memory[session_id] = session
+                self.parked.delete(session_id)
+            self._touched[session_id] = time.time()
+            return session
+
+    def put(self, session):
+        with self._lock:
+            self.memory[session.session_id] = session
+            self._touched[session.session_id] = time.time()
+
+    def delete(self, session_id):
+        with self._lock:
+            self.memory.pop(session_id, None)
+            self._touched.pop(session_id, None)
+        self.parked.delete(session_id)
+
+    def reap(self, idle_seconds=IDLE_SECONDS):
+        """Park sessions idle for `idle_seconds` and delete parked ones older than `parked_seconds`.
+
+        Returns the ids of the sessions moved out of memory.
+        """
+        cutoff = time.time() - idle_seconds
+        with self._lock:
+            idle = [sid for sid, touched in self._touched.items() if touched < cutoff]
+            for session_id in idle:
+                self.parked.put(self.memory.pop(session_id))
+                del self._touched[session_id]
+        self.parked.reap(self.parked_seconds)
+        session_registry.record_reaped(len(idle))
+        return idle
+
+class ConversationEngine:
+    """Async front end over the engine functions; blocking model calls run in worker threads."""
+
+    def __init__(self, store=None):
+        self.store = store or InMemorySessionStore()
+        self._locks = {}
+
+    def _lock(self, session_id):
+        # Serializes turns for one session within this worker; across workers the store's
+        # compare-and-swap rejects the later of two concurrent writes with SessionConflict
+        return self._locks.setdefault(session_id, asyncio.Lock())
+
+    async def start_session(self, role="Crew", scenario=None, personality=None, testing_mode=False, trainee=None):
+        session = new_session(role, scenario, personality, testing_mode, trainee)
+        await asyncio.to_thread(self.store.put, session)
+        return session
+
+    async def get_session(self, session_id):
+        # Store reads and writes may hit a shared disk, so they run off the event loop
+        session = await asyncio.to_thread(self.store.get, session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    async def take_turn(self, session_id, employee_message):
+        async with self._lock(session_id):
+            session = await self.get_session(session_id)
+            reply, _ = await asyncio.to_thread(customer_reply, session, employee_message)
+            await asyncio.to_thread(self.store.put, session)
+            return session, reply
+
+    async def finish(self, session_id):
+        async with self._lock(session_id):
+            session = await self.get_session(session_id)
+            from rule_scorer import prescore  # rule_scorer reads this module's rules
+            session.provisional = prescore(session.history, session.role)
+            await asyncio.to_thread(generate_coaching_feedback, session)
+            await asyncio.to_thread(self.store.put, session)
+            return session
+
+    async def end_session(self, session_id):
+        await asyncio.to_thread(self.store.delete, session_id)
+        self._locks.pop(session_id, None)
+
+    async def reap(self, idle_seconds=IDLE_SECONDS):
+        """Release sessions idle for `idle_seconds` from the store, forget their locks and sweep stale spill files."""
+        expired = await asyncio.to_thread(self.store.reap, idle_seconds)
+        await asyncio.to_thread(sweep_spill_files)
+        for session_id in expired:
+            lock = self._locks.get(session_id)
+            if lock is not None and not lock.locked():
+                del self._locks[session_id]
+        return expired
@@ -0,0 +1,169 @@
+import json
+import argparse
+import asyncio
+import tornado.web
+import tornado.ioloop
+import tornado.websocket
+from dotenv import load_dotenv
+from conversation_engine import ConversationEngine, InMemorySessionStore, FileSessionStore, SessionConflict
+from session_memory import REAP_INTERVAL, session_registry
+from warmup import start_warmup
+
+# Local HTTP/WebSocket API for the headless conversation engine.
+#
+#   POST   /sessions                     {"role", "scenario", "personality", "testing_mode"} -> session
+#   GET    /sessions/<id>                -> session
+#   DELETE /sessions/<id>
+#   POST   /sessions/<id>/turns          {"text"} -> {"reply", "session"}
+#   POST   /sessions/<id>/feedback       -> session (with feedback and scores)
+#   WS     /sessions/<id>/ws             send {"type": "turn", "text"} or {"type": "feedback"}
+#   GET    /stats                        -> live sessions and memory per session
+#   GET    /healthz                      -> warm-up status; 503 until it has finished
+#
+# Workers keep no state of their own when started with --store-dir on a shared volume,
+# so several can run behind a load balancer. A turn that races another worker's write to the
+# same session gets 409 and can be retried; sticky routing by session id avoids the races.
+
+class EngineHandler(tornado.web.RequestHandler):
+    def initialize(self, engine):
+        self.engine = engine
+
+    def body(self):
+        try:
+            data = json.loads(self.request.body or b"{}")
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise tornado.web.HTTPError(400, reason="Request body must be a JSON object")
+        return data
+
+    def send_json(self, data, status=200):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(data, ensure_ascii=False))
+
+    def write_error(self, status_code, **kwargs):
+        self.send_json({"error": self._reason}, status_code)
+
+    async def load(self, session_id):
+        try:
+            return await self.engine.get_session(session_id)
+        except KeyError:
+            raise tornado.web.HTTPError(404, reason="Unknown session")
+
+    def conflict(self):
+        return tornado.web.HTTPError(409, reason="Session was updated by another request; retry")
+
+class SessionsHandler(EngineHandler):
+    async def post(self):
+        data = self.body()
+        session = await self.engine.start_session(
+            role=data.get("role", "Crew"),
+            scenario=data.get("scenario"),
+            personality=data.get("personality"),
+            testing_mode=bool(data.get("testing_mode", False)),
+            trainee=data.get("trainee"),
+        )
+        self.send_json(session.to_dict(), 201)
+
+class SessionHandler(EngineHandler):
+    async def get(self, session_id):
+        session = await self.load(session_id)
+        self.send_json(session.to_dict())
+
+    async def delete(self, session_id):
+        await self.engine.end_session(session_id)
+        self.set_status(204)
+
+class TurnHandler(EngineHandler):
+    async def post(self, session_id):
+        text = self.body().get("text", "").strip()
+        if not text:
+            raise tornado.web.HTTPError(400, reason="Missing 'text'")
+        await self.load(session_id)
+        try:
+            session, reply = await self.engine.take_turn(session_id, text)
+        except SessionConflict:
+            raise self.conflict()
+        self.send_json({"reply": reply, "session": session.to_dict()})
+
+class FeedbackHandler(EngineHandler):
+    async def post(self, session_id):
+        await self.load(session_id)
+        try:
+            session = await self.engine.finish(session_id)
+        except SessionConflict:
+            raise self.conflict()
+        self.send_json(session.to_dict())
+
+class SessionSocket(tornado.websocket.WebSocketHandler):
+    def initialize(self, engine):
+        self.engine = engine
+
+    async def open(self, session_id):
+        self.session_id = session_id
+        try:
+            session = await self.engine.get_session(session_id)
+        except KeyError:
+            self.close(4404, "Unknown session")
+            return
+        self.write_message({"type": "session", "session": session.to_dict()})
+
+    async def on_message(self, message):
+        try:
+            data = json.loads(message)
+            if data.get("type") == "turn":
+                _, reply = await self.engine.take_turn(self.session_id, data["text"])
+                self.write_message({"type": "reply", "reply": reply})
+            elif data.get("type") == "feedback":
+                session = await self.engine.finish(self.session_id)
+                self.write_message({"type": "feedback", "summary": session.feedback, "scores": session.scores})
+            else:
+                self.write_message({"type": "error", "error": "Unknown message type"})
+        except Exception as e:
+            self.write_message({"type": "error", "error": str(e)})
+
+class HealthHandler(tornado.web.RequestHandler):
+    def initialize(self, warmup):
+        self.warmup = warmup
+
+    def get(self):
+        status = self.warmup.status()
+        self.set_status(200 if status["ready"] else 503)
+        self.finish(status)
+
+class StatsHandler(EngineHandler):
+    def get(self):
+        self.send_json(session_registry.stats())
+
+def make_app(engine, warmup=None):
+    args = {"engine": engine}
+    return tornado.web.Application([
+        (r"/sessions", SessionsHandler, args),
+        (r"/sessions/([0-9a-f]+)", SessionHandler, args),
+        (r"/sessions/([0-9a-f]+)/turns", TurnHandler, args),
+        (r"/sessions/([0-9a-f]+)/feedback", FeedbackHandler, args),
+        (r"/sessions/([0-9a-f]+)/ws", SessionSocket, args),
+        (r"/stats", StatsHandler, args),
+        (r"/healthz", HealthHandler, {"warmup": warmup or start_warmup(google=False, audio=False)}),
+    ])
+
+async def serve(port, store_dir=None):
+    store = FileSessionStore(store_dir) if store_dir else InMemorySessionStore()
+    engine = ConversationEngine(store)
+    # The API doesn't use Google or speech; warm the model connection and data only
+    make_app(engine, start_warmup(google=False, audio=False)).listen(port)
+    # Sessions abandoned without a DELETE are dropped once idle
+    tornado.ioloop.PeriodicCallback(engine.reap, REAP_INTERVAL * 1000).start()
+    print(f"Conversation engine listening on http://localhost:{port}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Run the conversation engine API")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--store-dir", help="shared session directory (default: in-memory)")
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.port, args.store_dir))
@@ -1,9 +1,16 @@
-import os
+import io
 import json
+import hashlib
+import queue
+import threading
+import httplib2
 import streamlit as st
+from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaIoBaseUpload
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 SCOPES = [
@@ -11,6 +18,13 @@ SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets"
 ]
 
+#Calling Folders on Google Drive
+FOLDER_CONVERSATIONS = "1bgLn49otCu9G7lP8XgkCdGPNDRm70hKX"
+FOLDER_TESTING = "1PD0VBVIyJIZPIcvE7h4sFwj02irgTrfL"
+
+# Uploads larger than this are sent in resumable chunks
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+
 def load_credentials():
     try:
         service_account_info = st.secrets["gcp_service_account"]
@@ -21,11 +35,54 @@ def load_credentials():
 
 creds = load_credentials()
 
+def refresh_credentials():
+    """Mint a fresh access token now instead of on the first API call."""
+    creds.refresh(Request())
+    return creds.expiry
+
+# API clients are built once per process and reused
+_clients = {}
+_clients_lock = threading.Lock()
+_http_pool = queue.LifoQueue()
+
+def get_service(name="drive", version="v3"):
+    key = (name, version)
+    if key not in _clients:
+        with _clients_lock:
+            if key not in _clients:
+                _clients[key] = build(name, version, credentials=creds, cache_discovery=False)
+    return _clients[key]
+
+@contextmanager
+def pooled_http():
+    """Borrow an authorized connection from the process-wide pool for the duration of the block.
+
+    httplib2 connections aren't thread-safe, so each one is used by a single request at a time;
+    Streamlit runs every script on a new thread, so they are pooled per process rather than per thread.
+    """
+    try:
+        http = _http_pool.get_nowait()
+    except queue.Empty:
+        http = AuthorizedHttp(creds, http=httplib2.Http())
+    try:
+        yield http
+    finally:
+        _http_pool.put(http)
+
+def get_gspread_client():
+    if "gspread" not in _clients:
+        with _clients_lock:
+            if "gspread" not in _clients:
+                import gspread
+                _clients["gspread"] = gspread.authorize(creds)
+    return _clients["gspread"]
+
 def get_sheet(sheet_name="BurgerXpress_Analytics"):
     try:
-        import gspread
-        gc = gspread.authorize(creds)
-        return gc.open(sheet_name).sheet1
+        key = ("sheet", sheet_name)
+        if key not in _clients:
+            _clients[key] = get_gspread_client().open(sheet_name).sheet1
+        return _clients[key]
     except Exception as e:
         st.error(f"Error accessing Google Sheet: {e}")
         raise
@@ -39,18 +96,33 @@ def append_to_sheet(data: list, sheet_name="BurgerXpress_Analytics"):
         st.error(f"Error appending data to Google Sheet: {e}")
         raise
 
-def upload_to_drive(file_path, folder_id=None):
+def upload_text_to_drive(filename, content, folder_id=None, mimetype="text/plain"):
+    """Upload `content` from memory. Skips the upload if a file with the same content hash already exists."""
     try:
-        service = build("drive", "v3", credentials=creds)
-        file_metadata = {"name": os.path.basename(file_path)}
+        data = content.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        service = get_service("drive", "v3")
+
+        query = f"appProperties has {{ key='sha256' and value='{content_hash}' }} and trashed=false"
+        if folder_id:
+            query += f" and '{folder_id}' in parents"
+        with pooled_http() as http:
+            existing = service.files().list(q=query, fields="files(id, webViewLink)").execute(http=http).get("files", [])
+        if existing:
+            st.info("Conversation already uploaded to Google Drive")
+            st.markdown(f"🔗 [View File]({existing[0].get('webViewLink')})")
+            return existing[0].get("webViewLink")
+
+        file_metadata = {"name": filename, "appProperties": {"sha256": content_hash}}
         if folder_id:
             file_metadata["parents"] = [folder_id]
-        media = MediaFileUpload(file_path, mimetype="text/plain")
-        uploaded = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields="id, webViewLink"
-        ).execute()
+        media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mimetype, resumable=len(data) > RESUMABLE_THRESHOLD)
+        with pooled_http() as http:
+            uploaded = service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields="id, webViewLink"
+            ).execute(http=http)
         st.success("✅ Conversation uploaded to Google Drive")
         st.markdown(f"🔗 [View File]({uploaded.get('webViewLink')})")
         return uploaded.get("webViewLink")
@@ -60,9 +132,10 @@ def upload_to_drive(file_path, folder_id=None):
 
 def list_files_in_folder(folder_id, mime_type='text/plain'):
     try:
-        service = build('drive', 'v3', credentials=creds)
+        service = get_service('drive', 'v3')
         query = f"'{folder_id}' in parents and mimeType='{mime_type}' and trashed=false"
-        results = service.files().list(q=query, fields="files(id, name)").execute()
+        with pooled_http() as http:
+            results = service.files().list(q=query, fields="files(id, name)").execute(http=http)
         return results.get('files', [])
     except Exception as e:
         st.error(f"Error listing files in Google Drive folder: {e}")
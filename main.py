@@ -1,21 +1,33 @@
 import streamlit as st
 import os
+import time
 import datetime
 from dotenv import load_dotenv
-import openai
-import json
 from PIL import Image
 import pandas as pd
 import re
-import random
 from google_utils import get_sheet
-from google_utils import creds
-from google_utils import upload_to_drive, append_to_sheet
+from google_utils import FOLDER_CONVERSATIONS
+from google_utils import upload_text_to_drive, append_to_sheet
+from google_utils import get_service, pooled_http
 from main_voice_tts import speak_and_display
 from voice_recorder import record_voice_message
-import tempfile
-from gtts import gTTS
 import plotly.express as px
+from openai_client import configure as configure_openai
+from conversation_engine import (
+    menu, rules, new_session, customer_reply, generate_coaching_feedback, transcribe, TieredSessionStore,
+)
+from transcript import save_session
+from rule_scorer import prescore, reconcile_scores
+from session_memory import approx_size, session_registry, start_reaper, PARKED_DIR
+from chart_report import build_chart_report
+from chart_utils import category_counts, lttb_downsample
+from analytics import prepare_conversation_frame, conversation_summary, prepare_usage_frame, top_consumers
+from tts_cache import tts_cache
+from run_timings import record_run_time, timed, timing_summary
+from warmup import process_warmup
+
+_run_started = time.perf_counter()
 
 #Styling
 st.set_page_config(page_title="Customer Service Training", page_icon="🍟", layout="wide")
@@ -70,7 +82,7 @@ def plotly_bar_chart(series, title):
     if not isinstance(series, pd.Series):
         st.warning("Invalid input to plotly_bar_chart. Must be a single Series.")
         return
-    counts = series.value_counts().sort_index()
+    counts = category_counts(series)
     fig = px.bar(
         x=counts.index.astype(str),
         y=counts.values,
@@ -80,9 +92,6 @@ def plotly_bar_chart(series, title):
     )
     st.plotly_chart(fig, use_container_width=True)
 
-#Calling Folders on Google Drive
-FOLDER_CONVERSATIONS = "1bgLn49otCu9G7lP8XgkCdGPNDRm70hKX"
-FOLDER_TESTING = "1PD0VBVIyJIZPIcvE7h4sFwj02irgTrfL"
 
 # Load environment variables
 load_dotenv()
@@ -91,37 +100,21 @@ openai_key = st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
 if not openai_key:
     raise ValueError("❌ OPENAI_API_KEY not found. Please add it to Streamlit secrets or .env")
 
-openai.api_key = openai_key
+configure_openai(openai_key)
 
-# Initialize OpenAI client
-MODEL = 'gpt-4o'
+# Show queue position while waiting for a shared OpenAI request slot
+def queue_status(placeholder):
+    def on_wait(waited, position):
+        placeholder.info(f"⏳ High demand right now. You are #{position} in line ({waited:.0f}s)...")
+    return on_wait
 
-# Load menu data
-def load_menu():
-    with open("data/menu.json", "r") as file:
-        return json.load(file)
-    
-# Load Customer Guidelines
-def load_rules():
-    with open("data/rules.json", "r") as file:
-        return json.load(file)
-
-def load_scenarios():
-    with open("data/scenarios.json", "r") as file:
-        return json.load(file)
-
-menu = load_menu()
-rules = load_rules()
-
-# System message to define the AI's role
-# Load scenarios
-scenarios_data = load_scenarios()
+def show_wait(waited):
+    if waited >= 1:
+        st.caption(f"⏳ Waited {waited:.1f}s for a free slot")
 
 # Initialize session state for navigation and conversation
 if "page" not in st.session_state:
     st.session_state.page = "Main Menu"  # Default page
-if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = []
 if "show_feedback" not in st.session_state:
     st.session_state.show_feedback = False
 if "selected_conversation" not in st.session_state:
@@ -129,229 +122,128 @@ if "selected_conversation" not in st.session_state:
 if "testing_mode" not in st.session_state:
     st.session_state.testing_mode = False
 
-# Function to save conversation history and feedback
-def save_conversation(history, feedback):
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H-%M-%S')
-    filename = f"conversation_{timestamp}.txt"
-    file_path = os.path.join(os.getcwd(), filename)
-
-    # Initialize analytics
-    employee_msgs = 0
-    customer_msgs = 0
-    escalation_keywords = ["manager", "escalate", "supervisor", "complain", "issue"]
-    escalation_flag = "No"
-
-    with open(file_path, "w", encoding="utf-8") as file:
-        file.write("=== Conversation History ===\n")
-        for entry in history:
-            role = entry['role'].capitalize()
-            content = entry['content']
-            file.write(f"{role}: {content}\n")
-
-            if role == "Employee":
-                employee_msgs += 1
-            elif role == "Customer":
-                customer_msgs += 1
-
-            if any(keyword in content.lower() for keyword in escalation_keywords):
-                escalation_flag = "Yes"
-
-        file.write("\n=== Coaching Feedback ===\n")
-
-        scores = st.session_state.get("scores", {})
-        file.write("\n=== AI Scoring ===\n")
-        for key, val in scores.items():
-            file.write(f"{key}: {val}\n")
-
-        file.write(feedback)
-
-        rating = st.session_state.get("feedback_rating")
-        feedback_text = st.session_state.get("feedback_text", "")
-        issue_description = st.session_state.get("issue_description", "")
-
-        if rating:
-            file.write(f"\n\n=== Feedback Rating ===\n{rating}/5")
-        if feedback_text:
-            file.write(f"\n\n=== Written Feedback ===\n{feedback_text}")
-        if issue_description:
-            file.write(f"\n\n=== Issue Description ===\n{issue_description}")
-
-    # Upload to Google Drive
-    folder_id = FOLDER_TESTING if st.session_state.testing_mode else FOLDER_CONVERSATIONS
-    drive_url = upload_to_drive(file_path, folder_id)
-
-    # Log all data to Google Sheets
-    scores = st.session_state.get("scores", {})
-    append_to_sheet([
-        filename,
-        timestamp,
-        rating or "N/A",
-        drive_url,
-        employee_msgs,
-        customer_msgs,
-        len(history),
-        escalation_flag,
-        scores.get("Rule Compliance", "N/A"),
-        scores.get("Escalation Handling", "N/A"),
-        scores.get("Professionalism", "N/A"),
-        scores.get("Clarity", "N/A")
-    ])
-
-    return filename
-
-# Function to generate coaching feedback
-def generate_coaching_feedback(history):
-    if len(history) < 3:
-        return {
-            "summary": "Conversation was too short to generate useful coaching feedback.",
-            "scores": {
-                "Rule Compliance": "N/A",
-                "Escalation Handling": "N/A",
-                "Professionalism": "N/A",
-                "Clarity": "N/A"
-            }
-        }
-
-    coaching_prompt = (
-        "You are a customer service coach analyzing a spoken conversation between an employee and a customer. "
-        "Focus on the employee's professionalism, clarity, tone, and escalation decisions — not grammar or punctuation. "
-        "The employee is speaking, not writing.\n\n"
-        "Return coaching feedback as a bullet-pointed list. Each point should be clear and reference the employee's actions or language. "
-        "Include one point per score category, with explanation and the score at the end like this:\n"
-        "- **Rule Compliance**: [explanation] (Score: 4/5)\n"
-        "- **Escalation Handling**: [explanation] (Score: Pass)\n"
-        "- **Professionalism**: [explanation] (Score: 3/5)\n"
-        "- **Clarity**: [explanation] (Score: 5/5)\n\n"
-        "At the end of your feedback, include a clear breakdown of the scores again, exactly like this:\n\n"
-        "=== Scores ===\n"
-        "Rule Compliance: 4\n"
-        "Escalation Handling: Pass\n"
-        "Professionalism: 3\n"
-        "Clarity: 5\n\n"
-        "Here is the conversation:\n" +
-        "\n".join([f"{entry['role'].capitalize()}: {entry['content']}" for entry in history])
-    )
+# Fragments rerun on their own; set DISABLE_FRAGMENTS=1 to benchmark against full-app reruns
+FRAGMENTS_ENABLED = not os.getenv("DISABLE_FRAGMENTS")
 
-    try:
-        response = openai.chat.completions.create(
-            model=MODEL,
-            messages=[{"role": "system", "content": coaching_prompt}],
-            stream=False
-        )
-        content = response.choices[0].message.content.strip()
-
-        summary, scores_block = content.split("=== Scores ===")
-        scores_lines = scores_block.strip().splitlines()
-        scores = {}
-        for line in scores_lines:
-            if ":" in line:
-                key, val = line.split(":", 1)
-                scores[key.strip()] = val.strip()
-
-        return {
-            "summary": summary.strip(),
-            "scores": scores
-        }
-    except Exception as e:
-        return {
-            "summary": f"An error occurred: {e}",
-            "scores": {
-                "Rule Compliance": "N/A",
-                "Escalation Handling": "N/A",
-                "Professionalism": "N/A",
-                "Clarity": "N/A"
-            }
-        }
+# Keep the wall time of recent script and fragment runs for the developer panel
+def timed_fragment(func):
+    """Make `func` an independently rerunning fragment and time each run."""
+    wrapper = timed(func, st.session_state)
+    return st.fragment(wrapper) if FRAGMENTS_ENABLED else wrapper
+
+# Static assets and styling only need to be built once per process
+@st.cache_resource
+def load_logo():
+    return Image.open("BurgerXpress_Logo.jpg")
+
+@st.cache_data
+def font_css(font_scale):
+    return f"""
+            <style>
+            html, body, [data-testid="stAppViewContainer"] * {{
+                font-size: {font_scale} !important;
+            }}
+            </style>
+        """
+
+# Conversations live in one store per server process; session_state only keeps the id,
+# so idle conversations can be parked on disk and leave memory
+@st.cache_resource(show_spinner=False)
+def session_store():
+    store = TieredSessionStore(PARKED_DIR)
+    start_reaper(store.reap)
+    return store
+
+def current_session():
+    session_id = st.session_state.get("session_id")
+    return session_store().get(session_id) if session_id else None
 
 # Function to reset the session state
 def reset_session():
-    st.session_state.conversation_history = []
+    session_id = st.session_state.pop("session_id", None)
+    if session_id:
+        session_store().delete(session_id)
     st.session_state.show_feedback = False
     st.session_state.selected_conversation = None
-    st.session_state.pop("chosen_scenario", None)
-    st.session_state.pop("chosen_personality", None)
+
+# Parked sessions are deleted after SESSION_PARKED_SECONDS; send the trainee back to the main menu
+def require_session():
+    session = current_session()
+    if session is None:
+        reset_session()
+        st.session_state.session_expired = True
+        st.session_state.page = "Main Menu"
+        st.rerun()  # full rerun, also when called inside a fragment
+    return session
+
+# Button callback for page navigation (runs before the rerun, so no second st.rerun() is needed)
+def go_to(page):
+    st.session_state.page = page
 
 # Main Menu Page
 def main_menu():
     st.title("🍔 Welcome to BurgerXpress Training")
+    if st.session_state.pop("session_expired", False):
+        st.warning("Your conversation expired after being idle for too long. Start a new one below.")
 
     st.markdown("Choose an action below:")
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        if st.button("📘 Instructions"):
-            st.session_state.page = "Instructions"
-            st.rerun()
+        st.button("📘 Instructions", on_click=go_to, args=("Instructions",))
     with col2:
-        if st.button("🗣️ Start Conversation"):
-            st.session_state.page = "Start Conversation"
-            st.rerun()
+        st.button("🗣️ Start Conversation", on_click=go_to, args=("Start Conversation",))
     with col3:
-        if st.button("📝 General Feedback"):
-            st.session_state.page = "General Feedback"
-            st.rerun()
+        st.button("📝 General Feedback", on_click=go_to, args=("General Feedback",))
 
     st.markdown("___")
     st.markdown("Use the sidebar to access more features or settings.")
 
-# System message to define the AI's role
-def format_conversation_for_openai(convo):
-    """Convert internal roles to valid OpenAI roles."""
-    chosen_scenario = st.session_state.get("chosen_scenario", "[Unknown scenario]")
-    chosen_personality = st.session_state.get("chosen_personality", "[Unknown personality]")
-
-    system_message = (
-        f"You are a {chosen_personality} customer at BurgerXpress. "
-        f"Your issue is: '{chosen_scenario}'\n"
-        "React naturally with tone and behavior that matches your personality. "
-        "Use the menu to support your complaint. "
-        "If the situation escalates too much and the employee is crew, they should call a manager.\n"
-        "Here is the menu data:\n\n" + json.dumps(menu, indent=2)
-    )
-
-    messages = [{"role": "system", "content": system_message}]
-    for entry in convo:
-        if entry["role"] == "employee":
-            messages.append({"role": "user", "content": entry["content"]})
-        elif entry["role"] == "customer":
-            messages.append({"role": "assistant", "content": entry["content"]})
-    return messages
-
 # Start Conversation Page
 def start_conversation():
-    if "chosen_scenario" not in st.session_state:
-        st.session_state.chosen_scenario = random.choice(scenarios_data["scenarios"])
-    if "chosen_personality" not in st.session_state:
-        st.session_state.chosen_personality = random.choice(scenarios_data["personalities"])
-
-    if not st.session_state.conversation_history:
-        chosen_scenario = st.session_state.chosen_scenario
-        chosen_personality = st.session_state.chosen_personality
+    session = require_session() if st.session_state.get("session_id") else None
+    if session is None:
+        session = new_session(
+            role=st.session_state.get("role", "Crew"),
+            testing_mode=st.session_state.testing_mode,
+            trainee=st.session_state.get("trainee"),
+        )
+        session_store().put(session)
+        st.session_state.session_id = session.session_id
 
-        st.info(f"🤖 Scenario: *{chosen_scenario}*  \n**Personality:** {chosen_personality}")
+        st.info(f"🤖 Scenario: *{session.scenario}*  \n**Personality:** {session.personality}")
 
-        init_message = "Hi, can I speak to someone about an issue with my order?"
-        st.session_state.conversation_history.append({"role": "customer", "content": init_message})
-        
-        if init_message.strip():
+        init_message = session.history[0].content
+        if session.opener_audio:
+            st.audio(session.opener_audio, format="audio/mp3")
+        elif init_message.strip():
             try:
-                tts = gTTS(text=init_message)
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmpfile:
-                    tts.save(tmpfile.name)
-                    st.audio(tmpfile.name, format="audio/mp3")
+                st.audio(tts_cache.synthesize(init_message), format="audio/mp3")
             except Exception as e:
                 st.error(f"Failed to synthesize speech: {e}")
         else:
             st.warning("No audio generated (message was empty).")
+    session.testing_mode = st.session_state.testing_mode
+
+    conversation_pane()
+    if st.session_state.get("show_feedback", False):
+        feedback_pane()
+
+def request_exit(pending):
+    st.session_state.pending_exit = pending
 
-    use_voice = st.toggle("🎙️ Use microphone input instead of typing?", value=False)
+# Chat history and input; reruns on its own for each turn
+@timed_fragment
+def conversation_pane():
+    session = require_session()
+    use_voice = st.toggle("🎙️ Use microphone input instead of typing?", value=False, key="use_voice")
 
-    for entry in st.session_state.conversation_history:
-        role = entry["role"]
+    for turn in session.history:
+        role = turn.role
         name = "Customer" if role == "customer" else "Employee"
         avatar = "🍔" if role == "customer" else "😎"
         with st.chat_message(name, avatar=avatar):
-            st.markdown(entry["content"])
+            st.markdown(turn.content)
 
     if not st.session_state.get("show_feedback", False):
         user_input = None
@@ -359,10 +251,11 @@ def start_conversation():
             audio_path = record_voice_message()
             if audio_path:
                 try:
-                    with open(audio_path, "rb") as audio_file:
-                        transcript = openai.Audio.transcribe("whisper-1", audio_file)
-                        user_input = transcript["text"]
-                        st.markdown(f"**You said:** {user_input}")
+                    status = st.empty()
+                    user_input, _ = transcribe(audio_path, on_wait=queue_status(status),
+                                               usage=session.usage, calls=session.calls)
+                    status.empty()
+                    st.markdown(f"**You said:** {user_input}")
                 except Exception as e:
                     st.error(f"Transcription failed: {e}")
                     user_input = None
@@ -372,26 +265,17 @@ def start_conversation():
         col1, col2 = st.columns(2)
         with col1:
             if user_input:
-                st.session_state.conversation_history.append({"role": "employee", "content": user_input})
-                messages = format_conversation_for_openai(st.session_state.conversation_history)
-
                 try:
-                    stream = openai.chat.completions.create(model=MODEL, messages=messages, stream=True)
-                    assistant_message = ""
-                    for chunk in stream:
-                        text = chunk.choices[0].delta.content or ''
-                        assistant_message += text
-
-                    st.session_state.conversation_history.append({"role": "customer", "content": assistant_message})
+                    status = st.empty()
+                    assistant_message, waited = customer_reply(session, user_input, on_wait=queue_status(status))
+                    status.empty()
+                    show_wait(waited)
 
                     with st.chat_message("assistant", avatar="🍔"):
                         st.markdown(assistant_message)
                         if assistant_message.strip():
                             try:
-                                tts = gTTS(text=assistant_message)
-                                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmpfile:
-                                    tts.save(tmpfile.name)
-                                    st.audio(tmpfile.name, format="audio/mp3")
+                                st.audio(tts_cache.synthesize(assistant_message), format="audio/mp3")
                             except Exception as e:
                                 st.error(f"Failed to synthesize speech: {e}")
                         else:
@@ -400,70 +284,69 @@ def start_conversation():
                     st.error(f"An error occurred: {str(e)}")
 
         with col2:
-            if st.button("❌ Exit Conversation"):
-                st.session_state.pending_exit = True
-                st.rerun()
+            st.button("❌ Exit Conversation", on_click=request_exit, args=(True,))
 
     if st.session_state.get("pending_exit", False):
         st.warning("Are you sure you want to end the conversation?")
         if st.button("✅ Yes, End and Get Feedback"):
             st.session_state.show_feedback = True
             st.session_state.pending_exit = False
-            feedback_result = generate_coaching_feedback(st.session_state.conversation_history)
-            st.session_state.feedback = feedback_result["summary"]
-            st.session_state.scores = feedback_result["scores"]
-            st.rerun()
-        if st.button("⬅️ Cancel"):
-            st.session_state.pending_exit = False
-            st.rerun()
+            # Local phrase-based scores show instantly while the coach is working
+            session.provisional = prescore(session.history, session.role)
+            show_provisional_scores(session.provisional)
+            status = st.empty()
+            with st.spinner("Your coach is reviewing the conversation..."):
+                generate_coaching_feedback(session, on_wait=queue_status(status))
+            st.rerun()  # full rerun to swap the input for the feedback pane
+        st.button("⬅️ Cancel", on_click=request_exit, args=(False,))
+
+def show_provisional_scores(provisional):
+    st.write("### Provisional Scores")
+    cols = st.columns(len(provisional["scores"]))
+    for col, (category, score) in zip(cols, provisional["scores"].items()):
+        col.metric(category, score if isinstance(score, str) else f"{score}/5")
+    st.caption(" · ".join(f"{'✅' if hit else '⬜'} {check}" for check, hit in provisional["checks"].items()))
+
+# Coaching feedback and post-chat form; submitting reruns only this pane
+@timed_fragment
+def feedback_pane():
+    session = require_session()
+    st.write("### Coaching Feedback")
+    for line in session.feedback.splitlines():
+        if line.strip().startswith("-"):
+            st.markdown(line.strip())
+        else:
+            st.markdown(line.strip())
 
-    if st.session_state.get("show_feedback", False):
-        st.write("### Coaching Feedback")
-        for line in st.session_state.feedback.splitlines():
-            if line.strip().startswith("-"):
-                st.markdown(line.strip())
-            else:
-                st.markdown(line.strip())
-
-        with st.form("post_chat_feedback_form"):
-            feedback_text = st.text_area("Your Feedback", placeholder="Describe your experience...", height=150)
-            rating = st.slider("Rate the experience", 1, 5, key="feedback_rating")
-            submitted = st.form_submit_button("✅ Submit Feedback")
-
-        issue_description = ""
-        if submitted:
-            report_issue = st.toggle("Do you want to report an issue?")
-            if report_issue:
-                issue_description = st.text_area("Describe the Issue", placeholder="Provide details about the issue...")
-
-            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            filename = f"conversation_{timestamp.replace(':', '-')}.txt"
-            file_path = os.path.join(os.getcwd(), filename)
-
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write("=== Conversation History ===\n")
-                for entry in st.session_state.conversation_history:
-                    f.write(f"{entry['role'].capitalize()}: {entry['content']}\n")
-                f.write("\n=== Coaching Feedback ===\n")
-                f.write(st.session_state.feedback)
-                f.write(f"\n\n=== Feedback Rating ===\n{rating}/5\n")
-                f.write(f"\n=== Written Feedback ===\n{feedback_text}\n")
-                if issue_description:
-                    f.write(f"\n=== Issue Reported ===\n{issue_description}\n")
-
-            if not st.session_state.testing_mode:
-                save_conversation(st.session_state.conversation_history, st.session_state.feedback)
-                st.toast(f"Saved: {filename}")
+    if session.provisional:
+        with st.expander("Provisional vs. coach scores"):
+            st.dataframe(reconcile_scores(session.provisional["scores"], session.scores), use_container_width=True)
 
+    with st.form("post_chat_feedback_form"):
+        feedback_text = st.text_area("Your Feedback", placeholder="Describe your experience...", height=150)
+        rating = st.slider("Rate the experience", 1, 5, key="feedback_rating")
+        submitted = st.form_submit_button("✅ Submit Feedback")
+
+    issue_description = ""
+    if submitted:
+        report_issue = st.toggle("Do you want to report an issue?")
+        if report_issue:
+            issue_description = st.text_area("Describe the Issue", placeholder="Provide details about the issue...")
+
+        if not st.session_state.testing_mode:
+            filename = save_session(session, FOLDER_CONVERSATIONS, rating, feedback_text, issue_description)
+            load_sheet_records.clear()  # show the new row on the dashboard right away
+            st.toast(f"Saved: {filename}")
             st.session_state.filename = filename
-            st.session_state.submitted = True
-            st.success("Conversation and feedback submitted successfully.")
 
-        if st.button("🏠 Return to Home"):
-            reset_session()
-            st.session_state.page = "Main Menu"
-            st.rerun()
-    
+        st.session_state.submitted = True
+        st.success("Conversation and feedback submitted successfully.")
+
+    if st.button("🏠 Return to Home"):
+        reset_session()
+        st.session_state.page = "Main Menu"
+        st.rerun()  # full rerun; a page change can't happen inside a fragment
+
 # Show Menu Page
 def show_menu():
     st.title("BurgerXpress Menu")
@@ -477,9 +360,7 @@ def show_menu():
     for item in menu["menu"]["meals"]["options"]:
         st.write(f"- **{item['name']}**: {item['description']}")
 
-    if st.button("Back to Main Menu"):
-        st.session_state.page = "Main Menu"
-        st.rerun()
+    st.button("Back to Main Menu", on_click=go_to, args=("Main Menu",))
 
 # Instructions Page
 def instructions():
@@ -505,9 +386,7 @@ def instructions():
     🔁 You can restart a new session by clicking **Return to Home** after any conversation.
     """)
 
-    if st.button("Back to Main Menu"):
-        st.session_state.page = "Main Menu"
-        st.rerun()
+    st.button("Back to Main Menu", on_click=go_to, args=("Main Menu",))
 
 # Service Guidlines
 def service_guidelines():
@@ -519,14 +398,11 @@ def service_guidelines():
     for key, guideline in rules['managerial_escalation_guidelines'].items():
         st.markdown(f"**{key.replace('_',' ').title()}**: {guideline}")
     
-    if st.button("Back to Main Menu"):
-        st.session_state.page = "Main Menu"
-        st.rerun()
+    st.button("Back to Main Menu", on_click=go_to, args=("Main Menu",))
 
 # Past Conversations Page
 def past_conversations():
     from google_utils import list_files_in_folder
-    from googleapiclient.discovery import build
 
     st.title("Past Conversations (Google Drive)")
 
@@ -543,17 +419,18 @@ def past_conversations():
 
         if selected_file_name:
             file_id = file_dict[selected_file_name]
-            service = build("drive", "v3", credentials=creds)
-            request = service.files().get_media(fileId=file_id)
+            request = get_service("drive", "v3").files().get_media(fileId=file_id)
 
             import io
             from googleapiclient.http import MediaIoBaseDownload
 
             fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
+            with pooled_http() as http:
+                request.http = http
+                downloader = MediaIoBaseDownload(fh, request)
+                done = False
+                while not done:
+                    _, done = downloader.next_chunk()
             fh.seek(0)
             content = fh.read().decode("utf-8")
 
@@ -572,73 +449,57 @@ def past_conversations():
 # Analytics Dashboard Page
 def analytics_dashboard():
     st.title("📊 Analytics Dashboard")
+    analytics_panel()
+
+# Sheet rows are cached briefly so dashboard reruns don't refetch them; this app clears the cache
+# after its own writes, and rows written elsewhere (other servers, self-play) show up within the TTL
+@st.cache_data(ttl=300, show_spinner=False)
+def load_sheet_records(sheet_name):
+    return get_sheet(sheet_name).get_all_records()
 
+# Switching dashboards reruns only this panel
+@timed_fragment
+def analytics_panel():
     dashboard_type = st.selectbox("Choose Analytics Type", ["Conversation Analytics", "Feedback Analytics"])
 
     try:
-        import gspread
-        from google.oauth2.service_account import Credentials
-        import pandas as pd
-
-        service_account_info = st.secrets["gcp_service_account"]
-        creds = Credentials.from_service_account_info(service_account_info, scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ])
-        gc = gspread.authorize(creds)
-
         if dashboard_type == "Conversation Analytics":
-            sheet = gc.open("BurgerXpress_Analytics").sheet1
-            records = sheet.get_all_records()
-            df = pd.DataFrame(records)
+            df = pd.DataFrame(load_sheet_records("BurgerXpress_Analytics"))
             if df.empty:
                 st.info("No conversation data available.")
                 return
 
-            df["Timestamp"] = pd.to_datetime(df.get("Timestamp"), format="%Y-%m-%d %H-%M-%S", errors="coerce")
-            df = df[df["Timestamp"].notnull()]
-            df["Rating"] = pd.to_numeric(df.get("Rating"), errors="coerce")
-            df["Employee Messages"] = pd.to_numeric(df.get("Employee Messages"), errors="coerce").fillna(0)
-            df["Customer Messages"] = pd.to_numeric(df.get("Customer Messages"), errors="coerce").fillna(0)
-            df["Conversation Length"] = pd.to_numeric(df.get("Conversation Length"), errors="coerce").fillna(0)
-            df["Escalation"] = df.get("Escalation", "No").fillna("No")
+            df = prepare_conversation_frame(df)
+            summary = conversation_summary(df)
 
             st.subheader("📈 Summary Stats")
             col1, col2, col3 = st.columns(3)
-            col1.metric("Total Conversations", len(df))
-            col2.metric("Avg Feedback Rating", f"{df['Rating'].mean():.2f}")
-            col3.metric("Avg Conversation Length", f"{df['Conversation Length'].mean():.0f} messages")
+            col1.metric("Total Conversations", summary["conversations"])
+            col2.metric("Avg Feedback Rating", f"{summary['avg_rating']:.2f}")
+            col3.metric("Avg Conversation Length", f"{summary['avg_length']:.0f} messages")
 
             st.subheader("📅 Conversations Over Time")
-            st.line_chart(df.groupby(df["Timestamp"].dt.date).size())
+            st.line_chart(lttb_downsample(summary["daily"]))
 
             #st.subheader("⭐ Rating Distribution")
             plotly_bar_chart(df["Rating"], title="Experience Ratings")
 
             st.subheader("🧾 Total Messages by Role")
-            st.bar_chart({
-                "Employee": df["Employee Messages"].sum(),
-                "Customer": df["Customer Messages"].sum(),
-            })
+            st.bar_chart(summary["messages_by_role"])
 
             st.subheader("🚨 Escalation Summary")
-            escalation_rate = (df["Escalation"] == "Yes").sum() / len(df) * 100
-            st.metric("Escalation Rate", f"{escalation_rate:.1f}%")
+            st.metric("Escalation Rate", f"{summary['escalation_rate']:.1f}%")
 
             st.subheader("📊 Coaching Scores")
-            for field in ["Rule Compliance", "Professionalism", "Clarity"]:
-                df[field] = pd.to_numeric(df.get(field), errors="coerce")
-            df["Escalation Handling"] = df.get("Escalation Handling", "N/A")
-            score_trend = df.set_index("Timestamp").resample("W").mean(numeric_only=True)[["Rule Compliance", "Professionalism", "Clarity"]]
-            st.line_chart(score_trend)
+            st.line_chart(summary["score_trend"])
 
             st.subheader("Escalation Handling (Pass/Fail)")
-            st.bar_chart(df["Escalation Handling"].value_counts())
+            st.bar_chart(summary["escalation_handling"])
+
+            usage_panel(df)
 
         elif dashboard_type == "Feedback Analytics":
-            sheet = gc.open("Feedback_Analytics").sheet1
-            records = sheet.get_all_records()
-            df = pd.DataFrame(records)
+            df = pd.DataFrame(load_sheet_records("Feedback_Analytics"))
             if df.empty:
                 st.info("No feedback entries available.")
                 return
@@ -668,9 +529,83 @@ def analytics_dashboard():
             st.subheader("💬 Suggestions & Issues")
             st.dataframe(df[["Suggestions", "Issues", "Link"]].fillna(""), use_container_width=True)
 
+            st.subheader("📦 Chart Report")
+            if st.button("Build Chart Report"):
+                with st.spinner("Rendering charts..."):
+                    archive_path, _ = export_feedback_charts(df)
+                if archive_path:
+                    with open(archive_path, "rb") as file:
+                        st.download_button("⬇️ Download Chart Report", file.read(),
+                                           file_name=os.path.basename(archive_path), mime="application/zip")
+
     except Exception as e:
         st.error(f"Failed to load analytics: {e}")
 
+# Token use and estimated cost per session, from the analytics rows
+def usage_panel(df):
+    usage = prepare_usage_frame(df)
+    if usage.empty:
+        return
+
+    st.subheader("💰 Usage & Cost")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Cost", f"${usage['Cost (USD)'].sum():.2f}")
+    col2.metric("Avg Cost / Session", f"${usage['Cost (USD)'].mean():.4f}")
+    col3.metric("Avg Tokens / Session", f"{(usage['Prompt Tokens'] + usage['Completion Tokens']).mean():,.0f}")
+    col4.metric("Tokens / Sec", f"{usage['Completion Tokens'].sum() / max(usage['Model Seconds'].sum(), 1e-9):.1f}")
+
+    st.line_chart(lttb_downsample(usage.set_index("Timestamp")["Cost (USD)"].resample("D").sum()))
+
+    group_fields = [field for field in ["Scenario", "Personality", "Role", "Trainee"] if field in usage.columns]
+    if not group_fields:
+        return
+    group_by = st.selectbox("Top consumers by", group_fields)
+    st.dataframe(top_consumers(usage, group_by).round(4), use_container_width=True)
+
+# Per-call usage for the conversation in progress
+def session_usage_summary():
+    session = current_session()
+    if session is None or not session.calls:
+        return
+    with st.expander("💰 Session Usage"):
+        usage = session.usage
+        st.caption(
+            f"{usage['requests']} requests · {usage['prompt_tokens']:,} prompt + "
+            f"{usage['completion_tokens']:,} completion tokens · ${usage['cost']:.4f}"
+        )
+        calls = pd.DataFrame(session.calls)[["kind", "prompt_tokens", "completion_tokens", "latency_s", "queued_s", "cost", "cached"]]
+        st.dataframe(calls, use_container_width=True)
+
+# Readiness and per-step timings of the boot warm-up
+def warmup_summary():
+    status = process_warmup().status()
+    label = "ready" if status["ready"] else "running"
+    with st.expander(f"🔥 Warm-up ({label})"):
+        rows = [
+            {"Step": name, "Status": step["status"],
+             "Seconds": "" if step["seconds"] is None else f"{step['seconds']:.2f}", "Error": step["error"] or ""}
+            for name, step in status["steps"].items()
+        ]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+# Memory held by this conversation and by all live sessions in the process
+def session_memory_summary():
+    stats = session_registry.stats()
+    with st.expander("🧠 Session Memory"):
+        session = current_session()
+        if session is not None:
+            st.caption(
+                f"This session: {approx_size(session) / 1024:.1f} KB · "
+                f"{len(session.history.recent)} turns in memory, {session.history.spilled} on disk"
+            )
+        col1, col2 = st.columns(2)
+        col1.metric("Live Sessions", stats["sessions"], f"{stats['idle']} idle", delta_color="off")
+        col2.metric("Avg / Session", f"{stats['bytes_per_session'] / 1024:.1f} KB")
+        st.caption(
+            f"{stats['bytes'] / 1024:.1f} KB total · {stats['turns_in_memory']} turns in memory, "
+            f"{stats['turns_spilled']} spilled · {stats['reaped']} idle sessions parked"
+        )
+
 # Feedback Page
 def general_feedback():
     st.title("General Feedback")
@@ -678,6 +613,11 @@ def general_feedback():
     if "feedback_start_time" not in st.session_state:
         st.session_state.feedback_start_time = datetime.datetime.now()
 
+    general_feedback_form()
+
+# Submitting the form reruns only this fragment
+@timed_fragment
+def general_feedback_form():
     with st.form("general_feedback_form"):
         st.markdown("### Experience Feedback")
 
@@ -705,28 +645,25 @@ def general_feedback():
 
         timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         filename = f"general_feedback_{timestamp.replace(':', '-')}.txt"
-        file_path = os.path.join(os.getcwd(), filename)
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write("=== General Feedback Submitted ===\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write(f"Time to complete: {duration_seconds} seconds\n")
-            f.write(f"Experience Rating: {rating}/5\n")
-            f.write(f"Task Clarity: {clarity}\n")
-            f.write(f"AI Quality: {ai_quality}\n")
-            f.write(f"Speed: {speed}\n")
-            f.write(f"Usability: {usability}\n")
-            f.write(f"Learning Value: {learning}\n")
-            f.write(f"Font Comfort: {font_comfort}\n")
-            f.write(f"Layout Clarity: {layout_clarity}\n")
-            f.write(f"Ease of Navigation: {accessibility}\n")
-            f.write(f"Suggestions: {suggestions}\n")
-            f.write(f"Issues: {issues}\n")
-
-        from google_utils import upload_to_drive, append_to_sheet
+        content = "\n".join([
+            "=== General Feedback Submitted ===",
+            f"Timestamp: {timestamp}",
+            f"Time to complete: {duration_seconds} seconds",
+            f"Experience Rating: {rating}/5",
+            f"Task Clarity: {clarity}",
+            f"AI Quality: {ai_quality}",
+            f"Speed: {speed}",
+            f"Usability: {usability}",
+            f"Learning Value: {learning}",
+            f"Font Comfort: {font_comfort}",
+            f"Layout Clarity: {layout_clarity}",
+            f"Ease of Navigation: {accessibility}",
+            f"Suggestions: {suggestions}",
+            f"Issues: {issues}",
+        ]) + "\n"
 
         if not st.session_state.testing_mode:
-            drive_url = upload_to_drive(file_path, folder_id=FOLDER_CONVERSATIONS)
+            drive_url = upload_text_to_drive(filename, content, folder_id=FOLDER_CONVERSATIONS)
             append_to_sheet([
                 timestamp,
                 duration_seconds,
@@ -743,65 +680,28 @@ def general_feedback():
                 issues,
                 drive_url
             ], sheet_name="Feedback_Analytics")
+            load_sheet_records.clear()
         
         st.success("Thank you! Your Feedback has been submitted.")
 
-# Export Charts as PNG
+# Export the feedback chart report (PNG + Plotly HTML, bundled as a zip)
 def export_feedback_charts(df):
-    import matplotlib.pyplot as plt
-    import os
-
-    export_dir = "/mnt/data/feedback_charts"
-    os.makedirs(export_dir, exist_ok=True)
-    saved_paths = []
-
     try:
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
-        df["Rating"] = pd.to_numeric(df["Rating"], errors="coerce")
-
-        # 1. Average Rating Over Time
-        plt.figure()
-        rating_trend = df.groupby(df["Timestamp"].dt.to_period("M"))["Rating"].mean()
-        rating_trend.index = rating_trend.index.to_timestamp()
-        plt.plot(rating_trend.index, rating_trend, marker="o")
-        plt.title("Average Experience Rating Over Time")
-        plt.ylabel("Rating")
-        plt.xlabel("Month")
-        rating_path = os.path.join(export_dir, "average_rating_over_time.png")
-        plt.savefig(rating_path)
-        saved_paths.append(rating_path)
-        plt.close()
-
-        # 2. AI Quality Distribution
-        plt.figure()
-        df["AI Quality"].value_counts().plot(kind="bar")
-        plt.title("AI Response Quality Distribution")
-        plt.ylabel("Responses")
-        plt.xlabel("Quality")
-        ai_path = os.path.join(export_dir, "ai_quality_distribution.png")
-        plt.savefig(ai_path)
-        saved_paths.append(ai_path)
-        plt.close()
-
-        # 3. Learning Value Pie Chart
-        plt.figure()
-        df["Learning"].value_counts().plot(kind="pie", autopct="%1.1f%%")
-        plt.title("Learning Value")
-        learning_path = os.path.join(export_dir, "learning_value.png")
-        plt.savefig(learning_path)
-        saved_paths.append(learning_path)
-        plt.close()
-
-        return saved_paths
+        archive_path, saved_paths = build_chart_report(df)
+        return archive_path, saved_paths
     except Exception as e:
         st.error(f"Chart export failed: {e}")
-        return []
+        return None, []
 
 # Main App Logic
 def main():
+    # Token, client, connection and audio warm-up, once per process. `python serve_app.py` has
+    # already started it at boot; under `streamlit run` the first script run starts it here
+    process_warmup()
+
     # Sidebar Navigation
     with st.sidebar:
-        st.image("BurgerXpress_Logo.jpg", use_container_width=True)
+        st.image(load_logo(), use_container_width=True)
         st.title("🍔 Navigation")
 
         st.markdown("### 🔠 Font Size")
@@ -809,13 +709,7 @@ def main():
         st.session_state.font_size = font_size
 
         font_scale = {"Small": "14px", "Medium": "18px", "Large": "22px"}[font_size]
-        st.markdown(f"""
-            <style>
-            html, body, [data-testid="stAppViewContainer"] * {{
-                font-size: {font_scale} !important;
-            }}
-            </style>
-        """, unsafe_allow_html=True)
+        st.markdown(font_css(font_scale), unsafe_allow_html=True)
 
         options = [
             "Main Menu", "Instructions", "Start Conversation", "Show Menu",
@@ -823,12 +717,11 @@ def main():
         ]
         st.markdown("### Navigation")
         for page in options:
-            if st.button(page, use_container_width=True):
-                st.session_state.page = page
-                st.rerun()
+            st.button(page, use_container_width=True, on_click=go_to, args=(page,))
 
         st.markdown("---")
         st.session_state.role = st.radio("Select Role", ["Crew", "Manager"], index=0)
+        st.session_state.trainee = st.text_input("Trainee ID (optional)").strip()
 
         st.markdown("---")
         st.markdown("### Developer Access")
@@ -836,6 +729,10 @@ def main():
         if pwd == "test123":
             st.session_state.testing_mode = True
             st.success("Testing Mode Enabled")
+            run_timing_summary()
+            session_usage_summary()
+            session_memory_summary()
+            warmup_summary()
         else:
             st.session_state.testing_mode = False
 
@@ -857,6 +754,17 @@ def main():
     elif st.session_state.page == "Analytics":
         analytics_dashboard()
 
+    record_run_time(st.session_state, "app", _run_started)
+
+# Rerun benchmark: wall time per full-app run vs. per fragment run
+def run_timing_summary():
+    timings = st.session_state.get("run_timings")
+    if not timings:
+        return
+    with st.expander("⏱️ Rerun Timings"):
+        st.dataframe(timing_summary(timings), use_container_width=True)
+        st.caption("Fragments " + ("enabled" if FRAGMENTS_ENABLED else "disabled (DISABLE_FRAGMENTS)"))
+
 # Run the Streamlit app
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,16 +1,12 @@
 import os
-from gtts import gTTS
 import streamlit as st
-from tempfile import NamedTemporaryFile
+from tts_cache import tts_cache
 
 # This function replaces the assistant message display in start_conversation()
 def speak_and_display(assistant_message):
     # Save and play audio
     try:
-        tts = gTTS(text=assistant_message)
-        with NamedTemporaryFile(delete=False, suffix=".mp3") as tmpfile:
-            tts.save(tmpfile.name)
-            st.audio(tmpfile.name, format="audio/mp3")
+        st.audio(tts_cache.synthesize(assistant_message), format="audio/mp3")
     except Exception as e:
         st.error(f"Failed to synthesize speech: {e}")
     
@@ -0,0 +1,109 @@
+import re
+
+# Prebuilt lookup over menu.json so each prompt only carries the relevant part of the menu
+
+# Name fragments and options that are too common in everyday speech to be useful keywords
+STOP_WORDS = {
+    "xpress", "the", "pack", "of", "b", "h&c", "10", "20", "7", "5",
+    "soft", "still", "double", "grand", "plain", "delight", "feast", "free sauce/dip",
+}
+
+DRINK_ITEMS = {"Water", "Juices", "Milkshake", "Coffee", "Soft Drinks"}
+
+# Generic words that point at a group of a la carte items
+GROUP_KEYWORDS = {
+    "burger": lambda item: "burger" in item["name"].lower() or "patty" in item.get("description", "").lower(),
+    "sandwich": lambda item: "patty" in item.get("description", "").lower(),
+    "drink": lambda item: item["name"] in DRINK_ITEMS,
+    "soda": lambda item: item["name"] == "Soft Drinks",
+    "shake": lambda item: item["name"] == "Milkshake",
+    "sauce": lambda item: item["name"] == "Sauces / Dips",
+    "dip": lambda item: item["name"] == "Sauces / Dips",
+    "packet": lambda item: item["name"] == "Sauces / Dips",
+    "chicken": lambda item: "chicken" in item["name"].lower() or "nuggets" in item["name"].lower(),
+}
+
+# Words that pull in a whole section
+SECTION_KEYWORDS = {
+    "kids_menu": ["kid", "kids", "child", "children", "toy", "son", "daughter"],
+    "meals": ["meal", "meals", "combo"],
+}
+
+def _singular(word):
+    return word[:-1] if word.endswith("s") and not word.endswith("ss") else word
+
+def _pattern(keywords):
+    alternatives = sorted({re.escape(k) for k in keywords}, key=len, reverse=True)
+    # Optional plural so "pickle"/"pickles" and "nugget"/"nuggets" both match
+    return re.compile(r"\b(" + "|".join(alternatives) + r")s?\b", re.IGNORECASE)
+
+class MenuIndex:
+    """item -> ingredients/options, keyword (names, ingredients, options) -> items and sections."""
+
+    def __init__(self, menu_data):
+        self.menu_data = menu_data
+        sections = menu_data["menu"]
+        self.items = {item["name"]: item for item in sections["a_la_carte"]}
+
+        self.item_terms = {}        # item -> ingredients, extras, options, flavors, types
+        self.keyword_items = {}     # keyword -> items
+        for name, item in self.items.items():
+            terms = set()
+            for key in ("ingredients", "extras", "special_requests", "options", "flavors", "types", "contains"):
+                for entry in item.get(key, []):
+                    term = entry["name"] if isinstance(entry, dict) else str(entry)
+                    terms.add(term)
+            self.item_terms[name] = terms
+
+            self._add(name.lower(), name)
+            for word in re.findall(r"[\w&-]+", name.lower()):
+                if word not in STOP_WORDS:
+                    self._add(_singular(word), name)
+            for term in terms:
+                if term.lower() not in STOP_WORDS:
+                    self._add(_singular(term.lower()), name)
+
+        for keyword, matches in GROUP_KEYWORDS.items():
+            for name, item in self.items.items():
+                if matches(item):
+                    self.keyword_items.setdefault(keyword, set()).add(name)
+
+        self.keyword_sections = {k: section for section, words in SECTION_KEYWORDS.items() for k in words}
+        self._specific = _pattern(k for k in self.keyword_items if k not in GROUP_KEYWORDS)
+        self._generic = _pattern(GROUP_KEYWORDS)
+        self._sections = _pattern(self.keyword_sections)
+
+    def _add(self, keyword, item_name):
+        if keyword:
+            self.keyword_items.setdefault(keyword, set()).add(item_name)
+
+    def lookup(self, text):
+        """Return (item names, section names) mentioned in `text`."""
+        specific = {_singular(m.lower()) for m in self._specific.findall(text)}
+        items = set().union(*(self.keyword_items.get(k, set()) for k in specific)) if specific else set()
+        if not items:
+            # Generic words ("burger", "drink") only count when nothing more specific was named
+            generic = {_singular(m.lower()) for m in self._generic.findall(text)}
+            items = set().union(*(self.keyword_items.get(k, set()) for k in generic)) if generic else set()
+        sections = {self.keyword_sections[m.lower()] for m in self._sections.findall(text) if m.lower() in self.keyword_sections}
+        return items, sections
+
+    def select(self, text):
+        """Menu data limited to the items and sections `text` refers to; the full menu when nothing matches."""
+        items, sections = self.lookup(text)
+        if not items and not sections:
+            return self.menu_data
+
+        menu = self.menu_data["menu"]
+        selected = {}
+        if items:
+            selected["a_la_carte"] = [item for name, item in self.items.items() if name in items]
+        if "kids_menu" in sections:
+            selected["kids_menu"] = menu["kids_menu"]
+        meal_options = [option for option in menu["meals"]["options"] if option["name"] in items]
+        if "meals" in sections or meal_options:
+            selected["meals"] = {
+                "options": menu["meals"]["options"] if "meals" in sections else meal_options,
+                "sizes": menu["meals"]["sizes"],
+            }
+        return {"restaurant": self.menu_data.get("restaurant"), "menu": selected}
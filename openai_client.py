@@ -0,0 +1,130 @@
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+import httpx
+import openai
+
+# Shared client settings (override with environment variables)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+# Idle pooled connections are kept this long (httpx closes them after 5s by default)
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "300"))
+
+# USD per 1M tokens (input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# USD per minute of audio
+AUDIO_PRICES = {
+    "whisper-1": 0.006,
+}
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+def estimate_audio_cost(model, seconds):
+    return AUDIO_PRICES.get(model, 0.0) * seconds / 60
+
+class FairSemaphore:
+    """Counting semaphore that hands out slots in arrival order."""
+
+    def __init__(self, value):
+        self._value = value
+        self._waiters = deque()
+        self._cond = threading.Condition()
+
+    def acquire(self, on_wait=None, poll_interval=0.5):
+        """Block until a slot is free. Returns the seconds spent queued.
+
+        `on_wait(seconds_waited, position)` is called every `poll_interval`
+        while the caller is still queued.
+        """
+        ticket = object()
+        start = time.monotonic()
+        with self._cond:
+            self._waiters.append(ticket)
+        try:
+            while True:
+                with self._cond:
+                    if self._value > 0 and self._waiters[0] is ticket:
+                        self._waiters.popleft()
+                        self._value -= 1
+                        self._cond.notify_all()
+                        return time.monotonic() - start
+                    self._cond.wait(poll_interval)
+                    position = None
+                    if not (self._value > 0 and self._waiters[0] is ticket):
+                        position = self._waiters.index(ticket) + 1
+                # Called without the lock so a slow callback (a Streamlit redraw) doesn't stall
+                # acquire/release for every other thread
+                if on_wait and position is not None:
+                    on_wait(time.monotonic() - start, position)
+        except BaseException:
+            # Streamlit stops the script by raising inside st calls; give the place back
+            with self._cond:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    self._cond.notify_all()
+            raise
+
+    def release(self):
+        with self._cond:
+            self._value += 1
+            self._cond.notify_all()
+
+    def queued(self):
+        with self._cond:
+            return len(self._waiters)
+
+_client = None
+_client_lock = threading.Lock()
+_api_key = None
+limiter = FairSemaphore(MAX_CONCURRENT_REQUESTS)
+
+def configure(api_key):
+    """Set the API key used when the shared client is first created."""
+    global _api_key
+    _api_key = api_key
+
+def get_client():
+    """Return the process-wide OpenAI client (pooled connections, timeouts, retries).
+
+    Retries use the SDK's exponential backoff, which honors `Retry-After` on 429s.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = openai.DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONCURRENT_REQUESTS * 2,
+                        max_keepalive_connections=MAX_CONCURRENT_REQUESTS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY,
+                    ),
+                )
+                _client = openai.OpenAI(
+                    api_key=_api_key or os.getenv("OPENAI_API_KEY"),
+                    timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                    max_retries=MAX_RETRIES,
+                    http_client=http_client,
+                )
+    return _client
+
+@contextmanager
+def request_slot(on_wait=None):
+    """Hold one of the shared in-flight request slots for the duration of the block.
+
+    Yields the number of seconds spent waiting in the queue.
+    """
+    waited = limiter.acquire(on_wait=on_wait)
+    try:
+        yield waited
+    finally:
+        limiter.release()
@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from gtts import gTTS
+from openai_client import get_client, request_slot
+
+# Pre-generated opening lines (text + audio) for every scenario x personality pair
+SCENARIOS_PATH = os.path.join("data", "scenarios.json")
+PACK_DIR = os.path.join("data", "openers")
+MODEL = "gpt-4o"
+# Attempts per opener text or audio file before it's left out of the pack
+ATTEMPTS = 3
+
+def scenarios_version(path=SCENARIOS_PATH):
+    """Short content hash of scenarios.json; a pack is only valid for the file it was built from."""
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()[:12]
+
+def pack_path(version):
+    return os.path.join(PACK_DIR, version)
+
+_loaded = {}
+# scenarios.json is hashed once per process, like the app loads it once at import
+_versions = {}
+
+def current_version():
+    if SCENARIOS_PATH not in _versions:
+        _versions[SCENARIOS_PATH] = scenarios_version(SCENARIOS_PATH)
+    return _versions[SCENARIOS_PATH]
+
+def load_opener_pack():
+    """Return the manifest for the current scenarios.json, or None if no matching pack was built."""
+    try:
+        version = current_version()
+    except OSError:
+        return None
+    if version not in _loaded:
+        try:
+            with open(os.path.join(pack_path(version), "manifest.json"), "r", encoding="utf-8") as file:
+                _loaded[version] = json.load(file)
+        except (OSError, ValueError):
+            return None
+    return _loaded[version]
+
+def pick_opener(scenario, personality, fixed=False):
+    """Pick a random pre-generated opener, or the first one if `fixed`. Returns (text, audio_path) or None."""
+    pack = load_opener_pack()
+    if not pack:
+        return None
+    options = pack["openers"].get(scenario, {}).get(personality)
+    if not options:
+        return None
+    choice = options[0] if fixed else random.choice(options)
+    audio_path = os.path.join(pack_path(pack["scenarios_version"]), choice["audio"]) if choice.get("audio") else None
+    if audio_path and not os.path.exists(audio_path):
+        audio_path = None
+    return choice["text"], audio_path
+
+def generate_openers(scenario, personality, variants, calls=None):
+    """Opener lines for one pair; the call's usage record is appended to `calls` when given."""
+    from conversation_engine import usage_record
+    prompt = (
+        f"You are a {personality} customer at BurgerXpress. "
+        f"Your issue is: '{scenario}'\n"
+        f"Write {variants} different first lines you would say when you walk up to an employee about this. "
+        "Each should be one or two spoken sentences that match your personality. "
+        'Return JSON like {"openers": ["...", "..."]}.'
+    )
+    with request_slot() as waited:
+        started = time.perf_counter()
+        response = get_client().chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "system", "content": prompt}],
+            response_format={"type": "json_object"},
+        )
+        latency = time.perf_counter() - started
+    if calls is not None:
+        calls.append(usage_record("opener", response.usage, latency, waited, model=MODEL))
+    openers = json.loads(response.choices[0].message.content)["openers"]
+    return [text.strip() for text in openers if text.strip()][:variants]
+
+def synthesize(text, path):
+    # Audio is named by a hash of its text, so an existing file is always the right one
+    if os.path.exists(path):
+        return path
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        gTTS(text=text).save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        # Only left behind when save or replace failed
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+def with_retries(func, *args):
+    """Call `func`, retrying with a short backoff; the last error is raised."""
+    for attempt in range(ATTEMPTS):
+        try:
+            return func(*args)
+        except Exception:
+            if attempt == ATTEMPTS - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+def audio_name(s_index, personality, text):
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+    return os.path.join("audio", f"{s_index:02d}_{personality}_{digest}.mp3")
+
+def previous_openers(out_dir):
+    """Openers from an earlier (possibly partial) build of this version, so a rerun resumes."""
+    try:
+        with open(os.path.join(out_dir, "manifest.json"), "r", encoding="utf-8") as file:
+            return json.load(file)["openers"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def build_opener_pack(variants=3, workers=16):
+    """Generate openers and audio for all pairs in parallel and write a versioned pack.
+
+    Pairs or audio files that still fail after retries are left out and listed under `failed`
+    in the manifest; rerunning the build only generates what is missing.
+    Returns (pack directory, failures, model usage totals of this build).
+    """
+    from conversation_engine import new_usage, add_usage
+    with open(SCENARIOS_PATH, "r", encoding="utf-8") as file:
+        scenarios_data = json.load(file)
+    version = scenarios_version()
+    out_dir = pack_path(version)
+    os.makedirs(os.path.join(out_dir, "audio"), exist_ok=True)
+    previous = previous_openers(out_dir)
+
+    pairs = [
+        (s_index, scenario, personality)
+        for s_index, scenario in enumerate(scenarios_data["scenarios"])
+        for personality in scenarios_data["personalities"]
+    ]
+
+    def opener_texts(pair):
+        _, scenario, personality = pair
+        done = [entry["text"] for entry in previous.get(scenario, {}).get(personality, [])]
+        if len(done) >= variants:
+            return done[:variants]
+        return with_retries(generate_openers, scenario, personality, variants, calls)
+
+    calls = []  # appended from the worker threads; totalled once they are done
+    failed = []
+    openers = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        text_jobs = [(pair, pool.submit(opener_texts, pair)) for pair in pairs]
+
+        audio_jobs = []
+        for (s_index, scenario, personality), job in text_jobs:
+            try:
+                lines = job.result()
+            except Exception as e:
+                failed.append({"scenario": scenario, "personality": personality, "stage": "text", "error": str(e)})
+                continue
+            entries = openers.setdefault(scenario, {}).setdefault(personality, [])
+            for text in lines:
+                entry = {"text": text, "audio": audio_name(s_index, personality, text)}
+                entries.append(entry)
+                path = os.path.join(out_dir, entry["audio"])
+                audio_jobs.append((scenario, personality, entry, pool.submit(with_retries, synthesize, text, path)))
+
+        for scenario, personality, entry, job in audio_jobs:
+            try:
+                job.result()
+            except Exception as e:
+                # The text is still served, just without pre-built audio
+                failed.append({"scenario": scenario, "personality": personality, "stage": "audio",
+                               "text": entry["text"], "error": str(e)})
+                entry["audio"] = None
+
+    usage = new_usage()
+    for record in calls:
+        add_usage(usage, record)
+
+    manifest = {
+        "scenarios_version": version,
+        "model": MODEL,
+        "variants": variants,
+        "created": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "complete": not failed,
+        "failed": failed,
+        "usage": usage,
+        "openers": openers,
+    }
+    tmp_path = os.path.join(out_dir, "manifest.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(out_dir, "manifest.json"))
+    return out_dir, failed, usage
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Build the opener asset pack for data/scenarios.json")
+    parser.add_argument("--variants", type=int, default=3, help="openers per scenario/personality pair")
+    parser.add_argument("--workers", type=int, default=16, help="parallel generation threads")
+    args = parser.parse_args()
+
+    out_dir, failed, usage = build_opener_pack(args.variants, args.workers)
+    print(f"Opener pack written to {out_dir}")
+    print(f"Model usage: {usage['requests']} requests, {usage['prompt_tokens']:,} prompt + "
+          f"{usage['completion_tokens']:,} completion tokens, ${usage['cost']:.4f}")
+    if failed:
+        for failure in failed:
+            print(f"  failed ({failure['stage']}): {failure['personality']} / {failure['scenario']}: {failure['error']}")
+        print(f"{len(failed)} item(s) left out; rerun to retry them.")
@@ -0,0 +1,78 @@
+import os
+import json
+import uuid
+import hashlib
+import threading
+
+# Record/replay cache for model responses used by testing mode
+CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", os.path.join(".cache", "responses"))
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+
+# Bump the mtime so eviction treats the file as recently used
+def mark_used(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def evict_lru(directory, suffix, max_entries):
+    """Delete the least recently used `suffix` files in `directory` beyond `max_entries`."""
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith(suffix)]
+    except OSError:
+        return
+    excess = len(entries) - max_entries
+    if excess <= 0:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:excess]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+class ResponseCache:
+    """Stores one JSON file per request hash and evicts least recently used entries."""
+
+    def __init__(self, directory=CACHE_DIR, max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model, messages, **params):
+        """Hash the exact message list, model and sampling params."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                content = json.load(file)["content"]
+        except (OSError, ValueError, KeyError):
+            return None
+        mark_used(path)
+        return content
+
+    def put(self, key, content):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"content": content}, file, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries beyond `max_entries`."""
+        with self._lock:
+            evict_lru(self.directory, ".json", self.max_entries)
+
+response_cache = ResponseCache()
@@ -0,0 +1,111 @@
+import re
+import time
+from conversation_engine import rules
+
+# Instant local pre-scoring from data/rules.json while the LLM coach is pending
+
+# Employee phrases that satisfy a rule, keyed by rule name in rules.json
+EMPLOYEE_PHRASES = {
+    "be_nice": [r"\b(hi|hello|hey|good (morning|afternoon|evening)|welcome)\b", r"\bhow can i help\b"],
+    "apologize": [r"\b(sorry|apologi[sz]e|apologies|my apologies|my bad)\b"],
+    "say_thank_you": [r"\b(thank(s| you)|appreciate)\b"],
+    "offer_solutions": [
+        r"\b(remake|replace|replacement|refund|fix that|make (you )?a new|get you (a |an |another |your )|"
+        r"bring (you|it)|i can (get|make|offer|give)|we can (get|make|offer|give)|on the house|free of charge|voucher|coupon)\b",
+    ],
+    "unable_to_resolve": [r"\b(get|grab|call|bring|fetch) (a|the|my) (manager|supervisor)\b", r"\bmanager (will|can) (help|be right)\b"],
+}
+
+# Customer phrases that mean the conversation should be escalated. Phrases rather than single words:
+# "sick of waiting" or "the review said" must not turn a complaint into a safety or threat escalation
+ESCALATION_TRIGGERS = {
+    "customer_requests_manager": [r"\b(speak|talk) (to|with) (a|the|your) (manager|supervisor)\b", r"\bget (me )?(a|the|your) manager\b"],
+    "threats_or_escalations": [
+        r"\b(never (coming|come) back|never (eat|eating|order|ordering) here again|report (you|this)|furious)\b",
+        r"\b(leave|leaving|write|writing|post|posting|give you) (a |an )?(bad |terrible |negative |one[- ]star |1[- ]star )review\b",
+    ],
+    "legal_or_safety_concerns": [
+        r"\b(got|get|getting|made me|make me|feel|feeling) (really |so )?sick\b(?! of)",
+        r"\b(food poisoning|allergic reaction|undercooked|hair in|lawyer|sue you|health (department|inspector|code))\b",
+        r"\b(raw|pink) (in the middle|inside|meat|chicken|patty|burger)\b",
+        r"\b(is|was|it'?s|looks) (still |totally |completely )?raw\b",
+        r"\b(i'?m|i am|he'?s|she'?s|my \w+ is) allergic\b",
+    ],
+}
+
+RUDE_PHRASES = [r"\b(calm down|not my problem|whatever|deal with it|can't help you|nothing i can do|shut up)\b"]
+
+def _compile(patterns):
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+# Only rules that exist in rules.json are checked
+EMPLOYEE_CHECKS = {
+    key: _compile(patterns) for key, patterns in EMPLOYEE_PHRASES.items()
+    if key in rules["customer_service_rules"] or key in rules["managerial_escalation_guidelines"]
+}
+TRIGGER_CHECKS = {
+    key: _compile(patterns) for key, patterns in ESCALATION_TRIGGERS.items()
+    if key in rules["managerial_escalation_guidelines"]
+}
+RUDE_CHECK = _compile(RUDE_PHRASES)
+
+CHECK_LABELS = {
+    "be_nice": "Greeting",
+    "apologize": "Apology",
+    "say_thank_you": "Thank-you",
+    "offer_solutions": "Offer of solution",
+    "unable_to_resolve": "Manager hand-off",
+}
+
+def _clip(value):
+    return max(1, min(5, round(value)))
+
+def prescore(history, role="Crew"):
+    """Provisional scores in the coaching rubric's categories, from phrase checks alone."""
+    started = time.perf_counter()
+    employee_turns = [t.content for t in history if t.role == "employee"]
+    employee_text = "\n".join(employee_turns)
+    customer_text = "\n".join(t.content for t in history if t.role == "customer")
+
+    checks = {key: bool(pattern.search(employee_text)) for key, pattern in EMPLOYEE_CHECKS.items()}
+    triggers = [key for key, pattern in TRIGGER_CHECKS.items() if pattern.search(customer_text)]
+    rude = len(RUDE_CHECK.findall(employee_text))
+    handed_off = checks.get("unable_to_resolve", False)
+
+    service_checks = [checks.get(key, False) for key in ("be_nice", "apologize", "say_thank_you", "offer_solutions")]
+    avg_words = sum(len(turn.split()) for turn in employee_turns) / max(len(employee_turns), 1)
+
+    if role == "Crew":
+        # Crew should hand off once the customer asks for a manager or it becomes a safety/legal issue
+        escalation = "Fail" if triggers and not handed_off else "Pass"
+    else:
+        # Managers are the escalation point and should resolve it themselves
+        escalation = "Fail" if triggers and not checks.get("offer_solutions", False) else "Pass"
+
+    scores = {
+        "Rule Compliance": _clip(1 + 4 * sum(service_checks) / len(service_checks)),
+        "Escalation Handling": escalation,
+        "Professionalism": _clip(3 + checks.get("be_nice", False) + checks.get("say_thank_you", False) - 2 * rude),
+        "Clarity": _clip(3 + checks.get("offer_solutions", False) + (5 <= avg_words <= 50) - (0 if employee_turns else 2)),
+    }
+    return {
+        "scores": scores,
+        "checks": {CHECK_LABELS.get(key, key): hit for key, hit in checks.items()},
+        "triggers": triggers,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
+def reconcile_scores(provisional, final):
+    """Rows comparing provisional and coach scores per category."""
+    rows = []
+    for category, estimate in provisional.items():
+        coach = final.get(category, "N/A")
+        try:
+            difference = f"{int(str(coach).split('/')[0]) - int(estimate):+d}"
+        except ValueError:
+            if coach == "N/A":
+                difference = "N/A"
+            else:
+                difference = "✓" if str(coach).strip().lower() == str(estimate).lower() else "✗"
+        rows.append({"Category": category, "Provisional": str(estimate), "Coach": str(coach), "Difference": difference})
+    return rows
@@ -0,0 +1,27 @@
+import time
+import functools
+import pandas as pd
+
+# Wall time of recent full-app and fragment runs (no Streamlit, so it can be tested headless)
+MAX_TIMINGS = 500
+
+def record_run_time(state, label, started):
+    """Append the time since `started` (a perf_counter value) to `state["run_timings"]`."""
+    timings = state.setdefault("run_timings", [])
+    timings.append({"Run": label, "ms": (time.perf_counter() - started) * 1000})
+    del timings[:-MAX_TIMINGS]
+
+def timed(func, state):
+    """Wrap `func` so each call's wall time is recorded in `state` under the function's name."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        record_run_time(state, func.__name__, started)
+        return result
+    return wrapper
+
+def timing_summary(timings):
+    """Run count, mean, median and 95th percentile milliseconds per run label."""
+    summary = pd.DataFrame(timings).groupby("Run")["ms"].describe(percentiles=[0.5, 0.95])
+    return summary[["count", "mean", "50%", "95%"]].round(1)
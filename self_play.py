@@ -0,0 +1,170 @@
+import time
+import json
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from conversation_engine import (
+    MODEL, rules, scenarios_data, new_session, customer_reply, generate_coaching_feedback, complete_chat,
+)
+
+# Batch AI-vs-AI self-play: a model plays the employee against the simulated customer
+ROLES = ["Crew", "Manager"]
+END_MARKER = "[END]"
+# Logged as the trainee so synthetic sessions can be told apart from real ones in the analytics sheet
+TRAINEE = "self-play"
+
+def employee_prompt(session):
+    guidelines = "\n".join(
+        f"- {rule}" for section in ("customer_service_rules", "managerial_escalation_guidelines")
+        for rule in rules[section].values()
+    )
+    handoff = (
+        "If the issue is beyond your authority or the customer keeps escalating, tell them you'll get a manager."
+        if session.role == "Crew" else
+        "You are the manager on duty; resolve the issue yourself within policy."
+    )
+    return (
+        f"You are a {session.role} employee at BurgerXpress speaking to a customer at the counter. "
+        "Reply with only what you would say out loud, in one to three sentences.\n"
+        f"{handoff}\n"
+        f"When the conversation is resolved or handed off, end your reply with {END_MARKER}.\n"
+        "Follow these service guidelines:\n" + guidelines
+    )
+
+def employee_turn(session):
+    """Return the employee's next line and whether they ended the conversation."""
+    messages = [{"role": "system", "content": employee_prompt(session)}]
+    for turn in session.history:
+        # From the employee's side the customer is the user
+        messages.append({
+            "role": "user" if turn.role == "customer" else "assistant",
+            "content": turn.content,
+        })
+    text, _ = complete_chat(messages, usage=session.usage, calls=session.calls, kind="employee")
+    return text.replace(END_MARKER, "").strip(), END_MARKER in text
+
+class RateLimiter:
+    """Spaces requests evenly so the whole run stays under `per_minute` requests."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+async def play_session(scenario, personality, role, args, sessions, limiter, save_limiter):
+    async with sessions:
+        session = new_session(role=role, scenario=scenario, personality=personality, trainee=TRAINEE)
+        try:
+            for _ in range(args.max_turns):
+                await limiter.acquire()
+                text, done = await asyncio.to_thread(employee_turn, session)
+                # A reply that was only the end marker ends the conversation without an empty turn
+                if text:
+                    await limiter.acquire()
+                    await asyncio.to_thread(customer_reply, session, text)
+                if done:
+                    break
+
+            if len(session.history) < 3:
+                raise RuntimeError("conversation too short to score")
+            await limiter.acquire()
+            feedback = await asyncio.to_thread(generate_coaching_feedback, session)
+            # Coaching failures come back as an "An error occurred" summary; don't save those as scored sessions
+            if feedback.get("error"):
+                raise RuntimeError(f"coaching failed: {feedback['error']}")
+
+            filename = None
+            if not args.no_save:
+                from google_utils import FOLDER_TESTING
+                from transcript import save_session
+                # Drive and Sheets have their own per-user quotas (Sheets: 60 writes/min), far below the model's
+                await save_limiter.acquire()
+                filename = await asyncio.to_thread(save_session, session, args.folder or FOLDER_TESTING)
+            error = None
+        except Exception as e:
+            filename, error = None, str(e)
+
+        return {
+            "session_id": session.session_id,
+            "scenario": scenario,
+            "personality": personality,
+            "role": role,
+            "turns": len(session.history),
+            "scores": session.scores,
+            "usage": session.usage,
+            "filename": filename,
+            "error": error,
+        }
+
+async def run(args):
+    combos = [
+        (scenario, personality, role)
+        for scenario in scenarios_data["scenarios"]
+        for personality in scenarios_data["personalities"]
+        for role in args.roles
+    ] * args.repeats
+    if args.limit:
+        combos = combos[:args.limit]
+
+    # Blocking engine calls run in threads; size the pool to the session concurrency
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.concurrency))
+    sessions = asyncio.Semaphore(args.concurrency)
+    limiter = RateLimiter(args.rpm)
+    save_limiter = RateLimiter(args.save_rpm)
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(
+        play_session(scenario, personality, role, args, sessions, limiter, save_limiter)
+        for scenario, personality, role in combos
+    ))
+    return results, time.monotonic() - started
+
+def report(results, elapsed):
+    completed = [r for r in results if not r["error"]]
+    prompt_tokens = sum(r["usage"]["prompt_tokens"] for r in results)
+    completion_tokens = sum(r["usage"]["completion_tokens"] for r in results)
+    requests = sum(r["usage"]["requests"] for r in results)
+    model_seconds = sum(r["usage"]["latency_s"] for r in results)
+    cost = sum(r["usage"]["cost"] for r in results)
+
+    print(f"Sessions: {len(completed)}/{len(results)} completed in {elapsed:.1f}s")
+    print(f"Throughput: {len(completed) / elapsed * 60:.1f} sessions/min, {requests / elapsed:.2f} requests/s")
+    print(f"Tokens: {prompt_tokens:,} prompt + {completion_tokens:,} completion "
+          f"({(prompt_tokens + completion_tokens) / elapsed:,.0f} tokens/s)")
+    print(f"Generation speed: {completion_tokens / max(model_seconds, 1e-9):,.1f} completion tokens/s per request")
+    print(f"Estimated cost: ${cost:.2f} total, ${cost / max(len(results), 1):.4f} per session ({MODEL})")
+    for r in results:
+        if r["error"]:
+            print(f"  failed: {r['role']} / {r['personality']} / {r['scenario']}: {r['error']}")
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Generate scored AI-vs-AI training transcripts")
+    parser.add_argument("--roles", nargs="+", default=ROLES, choices=ROLES)
+    parser.add_argument("--repeats", type=int, default=1, help="sessions per scenario/personality/role")
+    parser.add_argument("--limit", type=int, help="stop after this many sessions")
+    parser.add_argument("--max-turns", type=int, default=6, help="employee turns per session")
+    parser.add_argument("--concurrency", type=int, default=100, help="sessions in flight")
+    parser.add_argument("--rpm", type=float, default=500, help="request rate limit per minute")
+    parser.add_argument("--save-rpm", type=float, default=30,
+                        help="session saves per minute (each is a Drive upload and an analytics sheet append)")
+    parser.add_argument("--folder", help="Google Drive folder for transcripts (default: testing folder)")
+    parser.add_argument("--no-save", action="store_true", help="skip Drive upload and sheet logging")
+    parser.add_argument("--out", help="also write per-session results to this JSONL file")
+    args = parser.parse_args()
+
+    results, elapsed = asyncio.run(run(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            for result in results:
+                file.write(json.dumps(result, ensure_ascii=False) + "\n")
+    report(results, elapsed)
@@ -0,0 +1,29 @@
+import os
+import argparse
+import streamlit as st
+from dotenv import load_dotenv
+from streamlit.web import bootstrap
+from openai_client import configure as configure_openai
+from warmup import process_warmup
+
+# Start the app's warm-up at process boot, then serve main.py from the same process
+#
+#   python serve_app.py --port 8501
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the training app with a boot-time warm-up")
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--address", default=None)
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_openai(st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY"))
+    # Runs in background threads while the server starts; main.py picks up the same instance
+    process_warmup()
+
+    flag_options = {"server_port": args.port}
+    if args.address:
+        flag_options["server_address"] = args.address
+    bootstrap.load_config_options(flag_options)
+    bootstrap.run(APP_PATH, False, [], flag_options)
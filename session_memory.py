@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import weakref
+import threading
+
+# Bounded per-session memory: slotted turns, history capped in memory with older turns on local disk,
+# a cap on per-call usage records, and a reaper thread for idle sessions
+SPILL_DIR = os.getenv("SESSION_SPILL_DIR", os.path.join(".cache", "sessions"))
+PARKED_DIR = os.getenv("SESSION_PARKED_DIR", os.path.join(SPILL_DIR, "parked"))
+MAX_TURNS_IN_MEMORY = int(os.getenv("SESSION_MAX_TURNS", "40"))
+MAX_CALLS_PER_SESSION = int(os.getenv("SESSION_MAX_CALLS", "50"))
+IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "900"))
+PARKED_SECONDS = float(os.getenv("SESSION_PARKED_SECONDS", "86400"))
+REAP_INTERVAL = float(os.getenv("SESSION_REAP_INTERVAL", "60"))
+
+logger = logging.getLogger(__name__)
+
+class Turn:
+    """One message; roles are interned so every turn shares the same few strings."""
+
+    __slots__ = ("role", "content")
+
+    def __init__(self, role, content):
+        self.role = sys.intern(role)
+        self.content = content
+
+    def to_dict(self):
+        return {"role": self.role, "content": self.content}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["role"], data["content"])
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class TurnLog:
+    """Conversation history holding at most `limit` turns in memory; older turns go to a local JSONL file.
+
+    Iteration, len() and indexing cover the whole conversation.
+    """
+
+    __slots__ = ("recent", "spilled", "limit", "path", "_lock", "__weakref__")
+
+    def __init__(self, turns=(), limit=MAX_TURNS_IN_MEMORY):
+        self.recent = []
+        self.spilled = 0
+        self.limit = limit
+        self.path = None
+        self._lock = threading.RLock()  # the reaper thread may spill while a turn is appended
+        for turn in turns:
+            self.append(turn)
+
+    def append(self, turn):
+        with self._lock:
+            self.recent.append(turn)
+            if len(self.recent) > self.limit:
+                # Spill half at a time so the file isn't appended to on every turn
+                self.spill(len(self.recent) - self.limit // 2)
+
+    def spill(self, count=None):
+        """Move the oldest `count` in-memory turns (all of them by default) to disk."""
+        with self._lock:
+            count = len(self.recent) if count is None else count
+            if count <= 0:
+                return
+            if self.path is None:
+                os.makedirs(SPILL_DIR, exist_ok=True)
+                self.path = os.path.join(SPILL_DIR, f"{uuid.uuid4().hex}.jsonl")
+                # The spill file lives exactly as long as this log
+                weakref.finalize(self, _remove, self.path)
+            with open(self.path, "a", encoding="utf-8") as file:
+                for turn in self.recent[:count]:
+                    file.write(json.dumps(turn.to_dict(), ensure_ascii=False) + "\n")
+            del self.recent[:count]
+            self.spilled += count
+
+    def _spilled_turns(self):
+        if not self.spilled:
+            return []
+        with open(self.path, "r", encoding="utf-8") as file:
+            return [Turn.from_dict(json.loads(line)) for line in file]
+
+    def __iter__(self):
+        with self._lock:
+            return iter(self._spilled_turns() + self.recent)
+
+    def __len__(self):
+        return self.spilled + len(self.recent)
+
+    def __getitem__(self, index):
+        # Indexes into the in-memory tail are served without touching the disk
+        with self._lock:
+            if isinstance(index, int):
+                position = index + len(self) if index < 0 else index
+                if position >= self.spilled:
+                    return self.recent[position - self.spilled]
+            elif index.step in (None, 1):
+                start, stop, _ = index.indices(len(self))
+                if start >= self.spilled:
+                    return self.recent[start - self.spilled:max(stop - self.spilled, 0)]
+            return list(self)[index]
+
+def approx_size(obj, seen=None):
+    """Rough deep size in bytes of session data; shared objects (interned roles) count once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(key, seen) + approx_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(approx_size(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(approx_size(getattr(obj, name, None), seen) for name in obj.__slots__ if name not in ("_lock", "__weakref__"))
+    elif hasattr(obj, "__dict__"):
+        size += approx_size(vars(obj), seen)
+    return size
+
+def start_reaper(reap, interval=REAP_INTERVAL):
+    """Call `reap()` and sweep stale spill files every `interval` seconds on a daemon thread."""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                reap()
+                sweep_spill_files()
+            except Exception:
+                logger.exception("Session reaper failed")
+    thread = threading.Thread(target=run, name="session-reaper", daemon=True)
+    thread.start()
+    return thread
+
+class SessionRegistry:
+    """Weak registry of the session objects alive in this process, for memory reporting.
+
+    Sessions drop out of it as soon as nothing references them (e.g. after a store parks them).
+    """
+
+    def __init__(self, idle_seconds=IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._sessions = weakref.WeakValueDictionary()  # keyed by id(): reloads of one session are separate objects
+        self._lock = threading.Lock()
+        self.reaped = 0
+
+    def register(self, session):
+        with self._lock:
+            self._sessions[id(session)] = session
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def record_reaped(self, count):
+        with self._lock:
+            self.reaped += count
+
+    def stats(self):
+        sessions = self.sessions()
+        sizes = [approx_size(session) for session in sessions]
+        return {
+            "sessions": len(sessions),
+            "idle": sum(1 for session in sessions if time.time() - session.updated_at > self.idle_seconds),
+            "bytes": sum(sizes),
+            "bytes_per_session": sum(sizes) / len(sizes) if sizes else 0,
+            "turns_in_memory": sum(len(session.history.recent) for session in sessions),
+            "turns_spilled": sum(session.history.spilled for session in sessions),
+            "reaped": self.reaped,
+        }
+
+session_registry = SessionRegistry()
+
+def sweep_spill_files(max_age=PARKED_SECONDS):
+    """Delete spill files not written for `max_age` seconds that no live session here still uses.
+
+    Spill files are normally removed when their log is freed, but only by the process that wrote them;
+    this clears the ones left behind by a process that crashed or was killed. Returns how many were removed.
+    """
+    live = {session.history.path for session in session_registry.sessions()}
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = [e for e in os.scandir(SPILL_DIR) if e.name.endswith(".jsonl")]
+    except OSError:
+        return removed
+    for entry in entries:
+        try:
+            if entry.path not in live and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
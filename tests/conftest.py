@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app reads data/ with relative paths, some of it at import; import it from the repo root
+# without leaving the whole pytest process there
+with pytest.MonkeyPatch.context() as patch:
+    patch.chdir(ROOT)
+    import conversation_engine  # noqa: F401
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """Run each test from the repo root, as the app is run."""
+    monkeypatch.chdir(ROOT)
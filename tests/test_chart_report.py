@@ -0,0 +1,46 @@
+import os
+import sys
+import types
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chart_report import build_chart_report
+
+def feedback_frame(rows=60):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Timestamp": pd.date_range("2025-01-01", periods=rows, freq="D").strftime("%Y-%m-%d %H:%M:%S"),
+        "Rating": rng.integers(1, 6, rows),
+        "AI Quality": rng.choice(["Good", "Poor"], rows),
+        "Learning": rng.choice(["Yes", "No"], rows),
+        "Duration": rng.integers(1, 600, rows),
+    })
+
+def test_app_module_is_not_executed_in_render_workers(tmp_path, monkeypatch):
+    # Under Streamlit, sys.modules["__main__"] is main.py; rendering must not re-run it
+    marker = tmp_path / "app_ran"
+    app = tmp_path / "app.py"
+    app.write_text(f"open({str(marker)!r}, 'w').close()\n")
+    app_main = types.ModuleType("__main__")
+    app_main.__file__ = str(app)
+    app_main.__spec__ = None
+    monkeypatch.setitem(sys.modules, "__main__", app_main)
+
+    archive_path, chart_paths = build_chart_report(feedback_frame(), str(tmp_path / "report"), max_workers=2)
+
+    assert not marker.exists()
+    with zipfile.ZipFile(archive_path) as archive:
+        assert sorted(archive.namelist()) == sorted(os.path.basename(path) for path in chart_paths)
+
+def test_unchanged_data_reuses_the_archive(tmp_path):
+    export_dir = str(tmp_path / "report")
+    archive_path, _ = build_chart_report(feedback_frame(), export_dir, max_workers=2)
+    built = os.stat(archive_path).st_mtime_ns
+
+    assert build_chart_report(feedback_frame(), export_dir)[0] == archive_path
+    assert os.stat(archive_path).st_mtime_ns == built
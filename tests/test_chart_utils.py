@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chart_utils import MAX_BARS, auto_bin_count, category_counts, lttb_downsample
+
+def test_auto_bin_count_matches_numpy():
+    rng = np.random.default_rng(0)
+    for data in (rng.normal(size=1000), rng.exponential(size=5000), rng.integers(0, 100, 50).astype(float)):
+        assert auto_bin_count(data) == len(np.histogram_bin_edges(data, bins="auto")) - 1
+
+def test_outlier_does_not_blow_up_the_bins():
+    # One stray 1e10-second duration used to ask numpy for billions of bin edges
+    durations = pd.Series(np.r_[np.arange(1, 200), 1e10], name="Duration")
+    started = time.perf_counter()
+    counts = category_counts(durations)
+    assert time.perf_counter() - started < 1
+    assert len(counts) <= MAX_BARS
+    assert counts.sum() == len(durations)
+
+def test_numeric_series_is_capped_at_max_bars():
+    values = pd.Series(np.random.default_rng(0).normal(size=10_000), name="Seconds")
+    counts = category_counts(values, max_bins=12)
+    assert len(counts) == 12
+    assert counts.sum() == len(values)
+
+def test_few_distinct_values_are_counted_individually():
+    ratings = pd.Series([3, 5, 5, 1, 3, 5], name="Rating")
+    assert category_counts(ratings).to_dict() == {1: 1, 3: 2, 5: 3}
+
+def test_short_series_is_not_downsampled():
+    series = pd.Series([1.0, 3.0, 2.0], index=pd.date_range("2025-01-01", periods=3, freq="D"))
+    assert lttb_downsample(series, threshold=10) is series
+
+def test_downsampled_series_keeps_endpoints_and_order():
+    index = pd.date_range("2025-01-01", periods=10_000, freq="min")
+    series = pd.Series(np.random.default_rng(0).normal(size=len(index)), index=index)
+    sampled = lttb_downsample(series, threshold=200)
+
+    assert len(sampled) == 200
+    assert sampled.index[0] == index[0] and sampled.index[-1] == index[-1]
+    assert sampled.index.is_monotonic_increasing and sampled.index.is_unique
+    assert sampled.equals(series.loc[sampled.index])
+
+def test_spikes_survive_downsampling():
+    series = pd.Series(np.zeros(5_000), index=pd.date_range("2025-01-01", periods=5_000, freq="h"))
+    series.iloc[1234] = 50.0
+    series.iloc[4321] = -30.0
+    sampled = lttb_downsample(series, threshold=50)
+    assert sampled.max() == 50.0
+    assert sampled.min() == -30.0
+
+def test_date_and_plain_indexes_are_supported():
+    # Daily counts come from groupby(dt.date), an object index of datetime.date
+    dates = pd.date_range("2020-01-01", periods=2_000, freq="D")
+    by_date = pd.Series(np.arange(2_000.0), index=dates.date)
+    assert len(lttb_downsample(by_date, threshold=100)) == 100
+
+    by_seconds = pd.Series(np.arange(2_000.0), index=np.arange(2_000) * 0.5)
+    assert len(lttb_downsample(by_seconds, threshold=100)) == 100
+
+    by_label = pd.Series(np.arange(2_000.0), index=[f"session {i}" for i in range(2_000)])
+    assert len(lttb_downsample(by_label, threshold=100)) == 100
@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from menu_index import MenuIndex
+
+@pytest.fixture(scope="module")
+def menu():
+    with open(os.path.join(ROOT, "data", "menu.json"), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+@pytest.fixture(scope="module")
+def index(menu):
+    return MenuIndex(menu)
+
+def test_ingredients_and_plurals_point_at_their_items(index):
+    items, sections = index.lookup("My pickles were soggy")
+    assert "Xpress Cheeseburger" in items
+    assert "Milkshake" not in items
+    assert sections == set()
+
+def test_generic_words_only_count_without_a_specific_item(index):
+    assert "Water" in index.lookup("Is there a drink with this?")[0]
+    items, _ = index.lookup("My cheeseburger was cold and the drink was flat")
+    assert "Xpress Cheeseburger" in items
+    assert "Water" not in items
+
+def test_select_keeps_only_the_mentioned_items_and_their_meals(index, menu):
+    selected = index.select("Where are my nuggets?")
+    assert selected["restaurant"] == menu.get("restaurant")
+    assert {item["name"] for item in selected["menu"]["a_la_carte"]} == {
+        "Xpress 7 Pack Nuggets", "Xpress 10 Pack Nuggets", "Xpress 20 Pack Nuggets",
+    }
+    assert [option["name"] for option in selected["menu"]["meals"]["options"]] == [
+        "Xpress 7 Pack Nuggets", "Xpress 10 Pack Nuggets",
+    ]
+    assert selected["menu"]["meals"]["sizes"] == menu["menu"]["meals"]["sizes"]
+    assert "kids_menu" not in selected["menu"]
+
+def test_section_words_pull_in_whole_sections(index, menu):
+    selected = index.select("My son's kids meal came without a toy")
+    assert selected["menu"]["kids_menu"] == menu["menu"]["kids_menu"]
+    assert selected["menu"]["meals"]["options"] == menu["menu"]["meals"]["options"]
+    assert "a_la_carte" not in selected["menu"]
+
+def test_unmatched_text_falls_back_to_the_full_menu(index, menu):
+    assert index.select("Hello, I've been waiting a long time.") is menu
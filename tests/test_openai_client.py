@@ -0,0 +1,86 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from openai_client import FairSemaphore
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+def queue_up(semaphore, name, acquired, **kwargs):
+    """Start a thread that takes a slot, records `name` and gives the slot back."""
+    def run():
+        semaphore.acquire(**kwargs)
+        acquired.append(name)
+        semaphore.release()
+    queued = semaphore.queued()
+    thread = threading.Thread(target=run)
+    thread.start()
+    wait_until(lambda: semaphore.queued() == queued + 1)
+    return thread
+
+def test_slots_are_handed_out_in_arrival_order():
+    semaphore = FairSemaphore(1)
+    semaphore.acquire()
+    acquired = []
+    threads = [queue_up(semaphore, name, acquired, poll_interval=0.01) for name in range(8)]
+
+    semaphore.release()
+    for thread in threads:
+        thread.join(5)
+    assert acquired == list(range(8))
+
+def test_on_wait_reports_queue_position_while_blocked():
+    semaphore = FairSemaphore(1)
+    semaphore.acquire()
+    reports = {"first": [], "second": []}
+    acquired = []
+    threads = [
+        queue_up(semaphore, name, acquired, poll_interval=0.01,
+                 on_wait=lambda seconds, position, name=name: reports[name].append((seconds, position)))
+        for name in ("first", "second")
+    ]
+    wait_until(lambda: reports["second"])
+
+    semaphore.release()
+    for thread in threads:
+        thread.join(5)
+    assert acquired == ["first", "second"]
+    assert {position for _, position in reports["first"]} == {1}
+    assert 2 in {position for _, position in reports["second"]}
+    waited = [seconds for seconds, _ in reports["first"]]
+    assert waited == sorted(waited)
+
+def test_free_slot_is_taken_without_waiting():
+    semaphore = FairSemaphore(2)
+    reports = []
+    semaphore.acquire(on_wait=lambda *args: reports.append(args))
+    semaphore.acquire(on_wait=lambda *args: reports.append(args))
+    assert reports == []
+    assert semaphore.queued() == 0
+
+def test_stopped_waiter_gives_its_place_back():
+    semaphore = FairSemaphore(1)
+    semaphore.acquire()
+
+    def stop(seconds, position):
+        raise KeyboardInterrupt  # stands in for Streamlit stopping the script
+
+    with pytest.raises(KeyboardInterrupt):
+        semaphore.acquire(on_wait=stop, poll_interval=0.01)
+    assert semaphore.queued() == 0
+
+    acquired = []
+    thread = queue_up(semaphore, "next", acquired, poll_interval=0.01)
+    semaphore.release()
+    thread.join(5)
+    assert acquired == ["next"]
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import opener_pack
+from conversation_engine import new_session
+
+SCENARIO = "My burger is cold"
+PERSONALITY = "impatient"
+
+def fake_pack(monkeypatch, variants=5):
+    options = [{"text": f"opener {i}", "audio": None} for i in range(variants)]
+    pack = {"scenarios_version": "v1", "openers": {SCENARIO: {PERSONALITY: options}}}
+    monkeypatch.setattr(opener_pack, "load_opener_pack", lambda: pack)
+
+def test_testing_mode_always_gets_the_same_opener(monkeypatch):
+    fake_pack(monkeypatch)
+    openers = {new_session(scenario=SCENARIO, personality=PERSONALITY, testing_mode=True).history[0].content
+               for _ in range(20)}
+    assert openers == {"opener 0"}
+
+def test_normal_sessions_vary_the_opener(monkeypatch):
+    fake_pack(monkeypatch)
+    openers = {new_session(scenario=SCENARIO, personality=PERSONALITY).history[0].content for _ in range(50)}
+    assert len(openers) > 1
+
+def test_pack_version_is_hashed_once_per_process(monkeypatch):
+    hashed = []
+    monkeypatch.setattr(opener_pack, "_versions", {})
+    monkeypatch.setattr(opener_pack, "scenarios_version", lambda path: hashed.append(path) or "v1")
+    for _ in range(5):
+        opener_pack.pick_opener(SCENARIO, PERSONALITY)
+    assert hashed == [opener_pack.SCENARIOS_PATH]
+
+class FailingTTS:
+    def __init__(self, text):
+        self.text = text
+
+    def save(self, path):
+        with open(path, "w") as file:
+            file.write(self.text[:3])
+        raise OSError("tts down")
+
+def test_failed_synthesis_leaves_no_temp_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(opener_pack, "gTTS", FailingTTS)
+    with pytest.raises(OSError):
+        opener_pack.synthesize("Where is my order?", str(tmp_path / "opener.mp3"))
+    assert os.listdir(tmp_path) == []
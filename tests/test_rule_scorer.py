@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rule_scorer import prescore
+from session_memory import Turn
+
+def conversation(customer, employee="Hi, I'm sorry about that. I can remake it for you, thank you for waiting."):
+    return [Turn("customer", customer), Turn("employee", employee)]
+
+@pytest.mark.parametrize("complaint", [
+    "I'm sick of waiting for my order.",
+    "I read a review that said your fries were great, but these are cold.",
+    "The onions were raw and I asked for grilled ones.",
+    "This is unacceptable, I asked for no pickles.",
+])
+def test_ordinary_complaints_need_no_escalation(complaint):
+    result = prescore(conversation(complaint), role="Crew")
+    assert result["triggers"] == []
+    assert result["scores"]["Escalation Handling"] == "Pass"
+
+@pytest.mark.parametrize("complaint, trigger", [
+    ("My son got sick after eating here yesterday.", "legal_or_safety_concerns"),
+    ("I think this is food poisoning.", "legal_or_safety_concerns"),
+    ("The chicken is still raw inside.", "legal_or_safety_concerns"),
+    ("I'm going to leave a bad review about this place.", "threats_or_escalations"),
+    ("Let me speak to the manager.", "customer_requests_manager"),
+])
+def test_real_escalations_fail_crew_without_a_hand_off(complaint, trigger):
+    result = prescore(conversation(complaint), role="Crew")
+    assert trigger in result["triggers"]
+    assert result["scores"]["Escalation Handling"] == "Fail"
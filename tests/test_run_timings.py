@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from run_timings import MAX_TIMINGS, record_run_time, timed, timing_summary
+
+def test_timed_records_each_call_under_the_function_name():
+    state = {}
+
+    def conversation_pane(delay):
+        time.sleep(delay)
+        return "drawn"
+
+    pane = timed(conversation_pane, state)
+    assert pane(0.02) == "drawn"
+    assert pane.__name__ == "conversation_pane"
+    assert [entry["Run"] for entry in state["run_timings"]] == ["conversation_pane"]
+    assert state["run_timings"][0]["ms"] >= 20
+
+def test_failed_run_is_not_recorded():
+    state = {}
+
+    def broken():
+        raise RuntimeError("rerun stopped")
+
+    try:
+        timed(broken, state)()
+    except RuntimeError:
+        pass
+    assert state.get("run_timings", []) == []
+
+def test_only_recent_runs_are_kept():
+    state = {}
+    for run in range(MAX_TIMINGS + 20):
+        record_run_time(state, f"run {run}", time.perf_counter())
+    assert len(state["run_timings"]) == MAX_TIMINGS
+    assert state["run_timings"][0]["Run"] == "run 20"
+
+def test_summary_per_run_label():
+    timings = [{"Run": "app", "ms": ms} for ms in (100, 200, 300)] + [{"Run": "feedback_pane", "ms": 10}]
+    summary = timing_summary(timings)
+    assert list(summary.columns) == ["count", "mean", "50%", "95%"]
+    assert summary.loc["app", "count"] == 3
+    assert summary.loc["app", "50%"] == 200
+    assert summary.loc["feedback_pane", "mean"] == 10
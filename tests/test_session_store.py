@@ -0,0 +1,94 @@
+import gc
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from conversation_engine import FileSessionStore, SessionConflict, TieredSessionStore, new_session, record_usage, usage_record
+import session_memory
+from session_memory import MAX_CALLS_PER_SESSION, Turn, TurnLog, session_registry, sweep_spill_files
+
+def test_idle_session_is_parked_whole_and_reloaded(tmp_path):
+    store = TieredSessionStore(str(tmp_path))
+    session = new_session(trainee="t001")
+    session.history.append(Turn("employee", "Sorry about that, I'll remake it."))
+    session.feedback = "Good apology."
+    session.scores = {"Clarity": "4"}
+    store.put(session)
+    session_id = session.session_id
+    del session
+
+    assert store.reap(idle_seconds=-1) == [session_id]
+    assert store.memory == {}
+    gc.collect()
+    assert all(s.session_id != session_id for s in session_registry.sessions())
+
+    restored = store.get(session_id)
+    assert restored.feedback == "Good apology."
+    assert restored.scores == {"Clarity": "4"}
+    assert restored.trainee == "t001"
+    assert [turn.content for turn in restored.history][-1] == "Sorry about that, I'll remake it."
+    assert store.memory[session_id] is restored
+
+def test_session_in_use_is_not_parked(tmp_path):
+    store = TieredSessionStore(str(tmp_path))
+    session = new_session()
+    session.updated_at -= 10_000  # last turn long ago, but just read by the app
+    store.put(session)
+    assert store.reap(idle_seconds=60) == []
+
+def test_file_store_reaps_old_sessions(tmp_path):
+    store = FileSessionStore(str(tmp_path))
+    old, fresh = new_session(), new_session()
+    store.put(old)
+    store.put(fresh)
+    past = time.time() - 3600
+    os.utime(os.path.join(str(tmp_path), f"{old.session_id}.json"), (past, past))
+
+    assert store.reap(idle_seconds=60) == [old.session_id]
+    assert store.get(old.session_id) is None
+    assert store.get(fresh.session_id) is not None
+
+def test_call_records_are_capped_but_totals_kept():
+    session = new_session()
+    for _ in range(MAX_CALLS_PER_SESSION + 25):
+        record_usage(session.usage, session.calls, usage_record("customer", latency=0.1))
+    assert len(session.calls) == MAX_CALLS_PER_SESSION
+    assert session.usage["requests"] == MAX_CALLS_PER_SESSION + 25
+
+def test_file_store_rejects_a_stale_write(tmp_path):
+    # Two workers read the same session; the second write must not overwrite the first
+    store = FileSessionStore(str(tmp_path))
+    store.put(new_session())
+    session_id = next(name[:-len(".json")] for name in os.listdir(tmp_path) if name.endswith(".json"))
+    first, second = store.get(session_id), store.get(session_id)
+
+    first.history.append(Turn("employee", "First worker's turn."))
+    store.put(first)
+    second.history.append(Turn("employee", "Second worker's turn."))
+    with pytest.raises(SessionConflict):
+        store.put(second)
+    assert store.get(session_id).history[-1].content == "First worker's turn."
+
+def test_sweep_removes_stale_spill_files_left_by_other_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_memory, "SPILL_DIR", str(tmp_path))
+    session = new_session()
+    session.history = TurnLog(session.history, limit=2)
+    for i in range(4):
+        session.history.append(Turn("employee", f"Turn {i}"))
+    orphan = tmp_path / "crashed.jsonl"
+    orphan.write_text('{"role": "customer", "content": "left behind"}\n')
+    recent = tmp_path / "other-worker.jsonl"
+    recent.write_text("")
+    old = time.time() - 3600
+    for path in (orphan, session.history.path):
+        os.utime(path, (old, old))
+
+    assert sweep_spill_files(max_age=60) == 1
+    assert not orphan.exists()
+    assert recent.exists()
+    assert len(list(session.history)) == 5
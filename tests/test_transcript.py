@@ -0,0 +1,106 @@
+import os
+import sys
+import types
+
+import gspread
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from conversation_engine import new_session
+import transcript
+from transcript import ANALYTICS_HEADERS, ensure_headers, save_session
+
+OLD_HEADERS = ANALYTICS_HEADERS[:12]
+
+class FakeWorksheet(gspread.Worksheet):
+    """In-memory worksheet; get_all_records() is gspread's own implementation."""
+
+    def __init__(self, header):
+        self._properties = {"sheetId": 0, "title": "Sheet1", "index": 0}
+        self.rows = [list(header)]
+        self.client = FakeClient(self)
+        self.spreadsheet_id = "spreadsheet"
+        self.header_reads = 0
+
+    def row_values(self, row, **kwargs):
+        self.header_reads += row == 1
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def update(self, values, range_name=None, **kwargs):
+        assert range_name == "A1"
+        self.rows[0] = list(values[0])
+
+    def append_row(self, values, **kwargs):
+        self.rows.append(list(values))
+
+class FakeClient:
+    """Answers the values request behind Worksheet.get(); gspread pads short rows with ""."""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+
+    def values_get(self, spreadsheet_id, range_name, params=None):
+        return {"range": range_name, "majorDimension": "ROWS", "values": self.sheet.rows}
+
+@pytest.fixture
+def sheet(monkeypatch):
+    sheet = FakeWorksheet(OLD_HEADERS)
+    google_utils = types.ModuleType("google_utils")
+    google_utils.get_sheet = lambda name="BurgerXpress_Analytics": sheet
+    google_utils.append_to_sheet = lambda data, sheet_name="BurgerXpress_Analytics": sheet.append_row(data)
+    google_utils.upload_text_to_drive = lambda filename, content, folder_id=None: "https://drive.example/file"
+    monkeypatch.setitem(sys.modules, "google_utils", google_utils)
+    monkeypatch.setattr(transcript, "_checked_headers", {})
+    return sheet
+
+def test_ensure_headers_covers_a_wide_appended_row(sheet):
+    row = [f"v{i}" for i in range(len(ANALYTICS_HEADERS))]
+    ensure_headers(sheet, ANALYTICS_HEADERS)
+    sys.modules["google_utils"].append_to_sheet(row)
+
+    assert sheet.row_values(1) == ANALYTICS_HEADERS
+    assert list(sheet.get_all_records()[0].values()) == row
+
+def test_blank_header_cells_are_filled(sheet):
+    sheet.rows[0][2] = ""
+    ensure_headers(sheet, ANALYTICS_HEADERS)
+    assert sheet.row_values(1) == ANALYTICS_HEADERS
+
+def test_header_row_is_read_once_per_worksheet(sheet):
+    for _ in range(3):
+        save_session(new_session(), "folder")
+    assert sheet.header_reads == 1
+    assert len(sheet.get_all_records()) == 3
+
+def test_save_session_adds_missing_headers(sheet):
+    session = new_session(trainee="t001")
+    save_session(session, "folder", rating=4)
+
+    assert sheet.row_values(1) == ANALYTICS_HEADERS
+    records = sheet.get_all_records()
+    assert len(records) == 1
+    assert records[0]["Rating"] == 4
+    assert records[0]["Trainee"] == "t001"
+    assert records[0]["Requests"] == 0
+
+def test_existing_header_names_are_kept(sheet):
+    sheet.rows[0][3] = "Drive URL"
+    save_session(new_session(), "folder")
+    assert sheet.row_values(1)[3] == "Drive URL"
+    assert sheet.row_values(1)[12:] == ANALYTICS_HEADERS[12:]
+
+def test_provisional_scores_are_saved_next_to_the_coach_scores(sheet):
+    session = new_session()
+    session.scores = {"Rule Compliance": "4", "Escalation Handling": "Pass", "Professionalism": "5", "Clarity": "4"}
+    session.provisional = {
+        "scores": {"Rule Compliance": 3, "Escalation Handling": "Pass", "Professionalism": 4, "Clarity": 4},
+        "checks": {"Apology": True}, "triggers": [],
+    }
+    save_session(session, "folder")
+
+    record = sheet.get_all_records()[0]
+    assert record["Rule Compliance"] == 4
+    assert record["Provisional Rule Compliance"] == 3
+    assert record["Provisional Escalation Handling"] == "Pass"
@@ -0,0 +1,127 @@
+import datetime
+from conversation_engine import SCORE_CATEGORIES, conversation_stats
+
+# Column headers of the BurgerXpress_Analytics sheet, in the order save_session writes them
+ANALYTICS_HEADERS = [
+    "Filename", "Timestamp", "Rating", "Drive Link",
+    "Employee Messages", "Customer Messages", "Conversation Length", "Escalation",
+    "Rule Compliance", "Escalation Handling", "Professionalism", "Clarity",
+    "Scenario", "Personality", "Role", "Trainee",
+    "Requests", "Prompt Tokens", "Completion Tokens", "Model Seconds", "Cost (USD)",
+    # Phrase-check scores shown before the coach's, kept for auditing the two against each other
+    *(f"Provisional {category}" for category in SCORE_CATEGORIES),
+]
+
+# (spreadsheet id, worksheet id) -> headers already checked by this process, so saves don't reread row 1
+_checked_headers = {}
+
+def ensure_headers(sheet, headers):
+    """Fill in missing or blank header cells so the header row covers every column we write.
+
+    Existing header names are kept; get_all_records() fails on blank (duplicate) headers.
+    """
+    key = (sheet.spreadsheet_id, sheet.id)
+    if _checked_headers.get(key) == tuple(headers):
+        return
+    current = sheet.row_values(1)
+    merged = [name or (headers[i] if i < len(headers) else name) for i, name in enumerate(current)]
+    merged += headers[len(merged):]
+    if merged != current:
+        sheet.update([merged], "A1")
+    _checked_headers[key] = tuple(headers)
+
+# Single serializer for a finished training session
+def render_transcript(history, feedback, scores=None, rating=None, feedback_text="", issue_description="", calls=None, usage=None,
+                      provisional=None):
+    """Render the conversation, coaching feedback, scores and trainee feedback as one text document."""
+    lines = ["=== Conversation History ==="]
+    for turn in history:
+        lines.append(f"{turn.role.capitalize()}: {turn.content}")
+
+    lines += ["", "=== Coaching Feedback ===", feedback]
+
+    if scores:
+        lines += ["", "=== AI Scoring ==="]
+        lines += [f"{key}: {val}" for key, val in scores.items()]
+    if provisional:
+        lines += ["", "=== Provisional Scoring ==="]
+        lines += [f"{key}: {val}" for key, val in provisional["scores"].items()]
+        lines.append("Checks: " + ", ".join(f"{check} {'yes' if hit else 'no'}" for check, hit in provisional["checks"].items()))
+        lines.append("Escalation triggers: " + (", ".join(provisional["triggers"]) or "none"))
+    if usage or calls:
+        lines += ["", "=== Usage ==="]
+    if usage:
+        lines.append(
+            f"Total: {usage['requests']} requests, {usage['prompt_tokens']} prompt + "
+            f"{usage['completion_tokens']} completion tokens, ${usage.get('cost', 0):.4f}"
+        )
+    if calls:
+        lines.append(f"Last {len(calls)} calls:")
+        lines += [
+            f"{call['kind']}: {call['prompt_tokens']} prompt + {call['completion_tokens']} completion tokens, "
+            f"{call['latency_s']:.2f}s, ${call['cost']:.4f}" + (" (cached)" if call["cached"] else "")
+            for call in calls
+        ]
+    if rating:
+        lines += ["", "=== Feedback Rating ===", f"{rating}/5"]
+    if feedback_text:
+        lines += ["", "=== Written Feedback ===", feedback_text]
+    if issue_description:
+        lines += ["", "=== Issue Description ===", issue_description]
+
+    return "\n".join(lines) + "\n"
+
+# Upload the transcript and log the analytics row for a finished session
+def save_session(session, folder_id, rating=None, feedback_text="", issue_description=""):
+    """Returns the transcript filename."""
+    from google_utils import upload_text_to_drive, append_to_sheet, get_sheet
+
+    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H-%M-%S')
+    filename = f"conversation_{timestamp}_{session.session_id[:8]}.txt"
+    transcript = render_transcript(
+        session.history,
+        session.feedback or "",
+        scores=session.scores,
+        rating=rating,
+        feedback_text=feedback_text,
+        issue_description=issue_description,
+        calls=session.calls,
+        usage=session.usage,
+        provisional=session.provisional,
+    )
+
+    # Upload to Google Drive straight from memory
+    drive_url = upload_text_to_drive(filename, transcript, folder_id)
+
+    # Log all data to Google Sheets; older sheets may lack headers for the later columns
+    ensure_headers(get_sheet(), ANALYTICS_HEADERS)
+    stats = conversation_stats(session.history)
+    scores = session.scores or {}
+    provisional = (session.provisional or {}).get("scores", {})
+    usage = session.usage
+    append_to_sheet([
+        filename,
+        timestamp,
+        rating or "N/A",
+        drive_url,
+        stats["employee_msgs"],
+        stats["customer_msgs"],
+        stats["length"],
+        stats["escalation"],
+        scores.get("Rule Compliance", "N/A"),
+        scores.get("Escalation Handling", "N/A"),
+        scores.get("Professionalism", "N/A"),
+        scores.get("Clarity", "N/A"),
+        session.scenario,
+        session.personality,
+        session.role,
+        session.trainee or "",
+        usage["requests"],
+        usage["prompt_tokens"],
+        usage["completion_tokens"],
+        round(usage.get("latency_s", 0), 2),
+        round(usage.get("cost", 0), 5),
+        *(provisional.get(category, "") for category in SCORE_CATEGORIES),
+    ])
+
+    return filename
@@ -0,0 +1,42 @@
+import os
+import uuid
+import hashlib
+import threading
+from gtts import gTTS
+from response_cache import evict_lru, mark_used
+
+# Synthesized speech keyed by text, so repeated lines (the fallback opener, stock replies) skip gTTS
+CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(".cache", "tts"))
+MAX_ENTRIES = int(os.getenv("TTS_CACHE_MAX_ENTRIES", "500"))
+
+class TTSCache:
+    """One MP3 per text hash; least recently used files are evicted beyond `max_entries`."""
+
+    def __init__(self, directory=CACHE_DIR, max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def _path(self, text, lang):
+        key = hashlib.sha256(f"{lang}\n{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def synthesize(self, text, lang="en"):
+        """Return the path of an MP3 of `text`, calling gTTS only on a cache miss."""
+        path = self._path(text, lang)
+        if os.path.exists(path):
+            mark_used(path)
+            return path
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        gTTS(text=text, lang=lang).save(tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Drop the least recently used files beyond `max_entries`."""
+        with self._lock:
+            evict_lru(self.directory, ".mp3", self.max_entries)
+
+tts_cache = TTSCache()
@@ -0,0 +1,109 @@
+import time
+import importlib
+import threading
+
+# Once-per-process warm-up: pay token, connection and asset costs at boot instead of on the first turn
+
+def refresh_google_token():
+    from google_utils import refresh_credentials
+    refresh_credentials()
+
+def build_google_clients():
+    from google_utils import get_service, get_gspread_client, get_sheet, pooled_http
+    drive = get_service("drive", "v3")
+    # A cheap request leaves an open, authorized connection in the shared pool
+    with pooled_http() as http:
+        drive.about().get(fields="user").execute(http=http)
+    get_gspread_client()
+    get_sheet("BurgerXpress_Analytics")
+
+def open_model_connection():
+    # A cheap authenticated request leaves a TLS connection in the shared client's pool
+    from openai_client import get_client
+    from conversation_engine import MODEL
+    get_client().models.retrieve(MODEL)
+
+def load_data_files():
+    from opener_pack import load_opener_pack
+    importlib.import_module("conversation_engine")  # menu, rules, scenarios and the menu index load on import
+    load_opener_pack()
+
+def prime_audio_cache():
+    from tts_cache import tts_cache
+    from conversation_engine import DEFAULT_OPENER
+    tts_cache.synthesize(DEFAULT_OPENER)
+
+# Steps in one chain run in order in their own thread; chains run in parallel
+GOOGLE_STEPS = [("google_token", refresh_google_token), ("google_clients", build_google_clients)]
+MODEL_STEPS = [("model_connection", open_model_connection)]
+DATA_STEPS = [("data_files", load_data_files), ("audio_cache", prime_audio_cache)]
+
+class WarmUp:
+    """Runs warm-up chains in background threads and records each step's status and timing."""
+
+    def __init__(self, chains):
+        self.chains = chains
+        self.steps = {name: {"status": "pending", "seconds": None, "error": None} for chain in chains for name, _ in chain}
+        self.started = None
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.started = time.time()
+        for chain in self.chains:
+            thread = threading.Thread(target=self._run_chain, args=(chain,), name="warmup", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _run_chain(self, chain):
+        for name, step in chain:
+            self._update(name, status="running")
+            started = time.perf_counter()
+            try:
+                step()
+                self._update(name, status="ok", seconds=time.perf_counter() - started)
+            except Exception as e:
+                # A failed step only means that cost is paid later; the rest of the chain still runs
+                self._update(name, status="failed", seconds=time.perf_counter() - started, error=str(e))
+
+    def _update(self, name, **values):
+        with self._lock:
+            self.steps[name].update(values)
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        return self.ready()
+
+    def ready(self):
+        with self._lock:
+            return all(step["status"] in ("ok", "failed") for step in self.steps.values())
+
+    def status(self):
+        with self._lock:
+            steps = {name: dict(step) for name, step in self.steps.items()}
+        return {
+            "ready": all(step["status"] in ("ok", "failed") for step in steps.values()),
+            "healthy": all(step["status"] == "ok" for step in steps.values()),
+            "started": self.started,
+            "steps": steps,
+        }
+
+def start_warmup(google=True, audio=True):
+    """Start the warm-up in background threads and return it."""
+    data_steps = DATA_STEPS if audio else DATA_STEPS[:1]
+    chains = ([GOOGLE_STEPS] if google else []) + [MODEL_STEPS, data_steps]
+    return WarmUp(chains).start()
+
+_process_warmup = None
+_process_warmup_lock = threading.Lock()
+
+def process_warmup():
+    """The process's single full warm-up, started on the first call."""
+    global _process_warmup
+    with _process_warmup_lock:
+        if _process_warmup is None:
+            _process_warmup = start_warmup()
+    return _process_warmup